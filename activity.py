@@ -0,0 +1,141 @@
+"""Time-bucketed interaction counts for dashboards and capacity planning.
+
+`activity_buckets` holds one row per (resolution, bucket, action_type),
+where ``bucket`` is the Unix epoch second the bucket starts at (UTC) and
+``resolution`` is its width in seconds. An InteractionWriter hook adds
+each batch to the minute, hour and day buckets in the same transaction as
+the INSERT, so a series for any range is a primary-key range scan.
+
+Minute and hour buckets are pruned after ``BUCKET_RETENTION`` seconds;
+day buckets are kept for good, even after the rows behind them are
+archived.
+"""
+import time
+from collections import Counter
+
+from derived_tables import create_missing
+
+RESOLUTIONS = {
+    'minute': 60,
+    'hour': 3600,
+    'day': 86400,
+}
+
+# Seconds each resolution is kept for; None keeps it forever
+BUCKET_RETENTION = {
+    60: 14 * 86400,
+    3600: 400 * 86400,
+    86400: None,
+}
+
+ACTIVITY_TABLES = ('activity_buckets',)
+
+# Upper bound on buckets returned by one series request
+MAX_SERIES_BUCKETS = 2000
+
+ACTIVITY_SCHEMA = """
+CREATE TABLE IF NOT EXISTS activity_buckets (
+  resolution INTEGER NOT NULL,
+  bucket INTEGER NOT NULL,
+  action_type TEXT NOT NULL,
+  count INTEGER NOT NULL,
+  PRIMARY KEY (resolution, bucket, action_type)
+) WITHOUT ROWID;
+"""
+
+UPSERT_BUCKET = (
+    'INSERT INTO activity_buckets (resolution, bucket, action_type, count) VALUES (?, ?, ?, ?) '
+    'ON CONFLICT (resolution, bucket, action_type) DO UPDATE SET count = count + excluded.count'
+)
+
+# Stored timestamps are naive local time; the 'utc' modifier converts them to UTC
+BACKFILL_BUCKETS = (
+    'INSERT INTO activity_buckets (resolution, bucket, action_type, count) '
+    "SELECT ?, CAST(strftime('%s', timestamp, 'utc') AS INTEGER) / ? * ? AS bucket, action_type, COUNT(*) "
+    'FROM interactions WHERE timestamp IS NOT NULL GROUP BY bucket, action_type'
+)
+
+
+class ActivityBuckets:
+    """Maintains and reads `activity_buckets`."""
+
+    def __init__(self, prune_interval=3600.0):
+        self.prune_interval = prune_interval
+        self._ready = False
+        self._last_prune = 0.0
+
+    def ensure_schema(self, db):
+        """Creates `activity_buckets` if missing, backfilling it from existing history."""
+        if not self._ready:
+            create_missing(db, ACTIVITY_TABLES, ACTIVITY_SCHEMA, self.rebuild, 'Activity')
+            self._ready = True
+
+    def record(self, db, interactions):
+        """InteractionWriter hook: adds a batch to every resolution, pruning now and then."""
+        counts = Counter()
+        for interaction in interactions:
+            if interaction.action_type is None:
+                continue
+            epoch = int(interaction.timestamp.timestamp())
+            for seconds in RESOLUTIONS.values():
+                counts[(seconds, epoch - epoch % seconds, interaction.action_type)] += 1
+        db.executemany(UPSERT_BUCKET, [(*key, n) for key, n in counts.items()])
+
+        now = time.time()
+        if now - self._last_prune >= self.prune_interval:
+            self._last_prune = now
+            self.prune(db, now)
+
+    def prune(self, db, now=None):
+        """Deletes buckets older than their resolution's retention; the caller commits."""
+        now = now or time.time()
+        for seconds, keep in BUCKET_RETENTION.items():
+            if keep is not None:
+                db.execute('DELETE FROM activity_buckets WHERE resolution = ? AND bucket < ?',
+                           (seconds, int(now - keep)))
+
+    def rebuild(self, db):
+        """Recomputes every resolution from `interactions`; the caller commits."""
+        db.execute('DELETE FROM activity_buckets')
+        for seconds in RESOLUTIONS.values():
+            db.execute(BACKFILL_BUCKETS, (seconds, seconds, seconds))
+        self.prune(db)
+
+    def series(self, db, resolution, start, end, action_types=None):
+        """Returns dense per-action_type counts for buckets in [start, end).
+
+        ``start`` and ``end`` are epoch seconds and are aligned down to the
+        resolution.
+        """
+        self.ensure_schema(db)
+        seconds = RESOLUTIONS[resolution]
+        start -= start % seconds
+        end -= end % seconds
+        # Checked before building anything sized by the range
+        span = max(end - start, 0) // seconds
+        if span > MAX_SERIES_BUCKETS:
+            raise ValueError(f"Range spans {span} {resolution} buckets; at most {MAX_SERIES_BUCKETS}")
+        buckets = list(range(start, end, seconds))
+
+        query = ('SELECT bucket, action_type, count FROM activity_buckets '
+                 'WHERE resolution = ? AND bucket >= ? AND bucket < ?')
+        params = [seconds, start, end]
+        if action_types:
+            query += f" AND action_type IN ({', '.join('?' * len(action_types))})"
+            params.extend(action_types)
+
+        series = {action_type: [0] * len(buckets) for action_type in action_types or ()}
+        for bucket, action_type, count in db.execute(query, params):
+            counts = series.get(action_type)
+            if counts is None:
+                counts = series[action_type] = [0] * len(buckets)
+            counts[(bucket - start) // seconds] = count
+        return {
+            "resolution": resolution,
+            "seconds": seconds,
+            "start": start,
+            "end": end,
+            "buckets": buckets,
+            "series": series,
+            "totals": [sum(column) for column in zip(*series.values())] if series else [0] * len(buckets),
+        }
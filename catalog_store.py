@@ -0,0 +1,147 @@
+import json
+import os
+import threading
+import time
+
+from compiled_catalog import open_if_fresh
+from payloads import PreparedPayload
+
+
+def normalize_name(name):
+    return ' '.join(str(name).split()).casefold()
+
+
+class CatalogSnapshot:
+    """An immutable, fully loaded version of the glyph catalog.
+
+    Lookup indexes are built together with the glyph list, so every reader
+    sees indexes that match the glyphs they were built from.
+    """
+
+    def __init__(self, glyphs, signature, loaded_at, source='json', payload=None):
+        self.glyphs = glyphs
+        self.source = source
+        self.signature = signature
+        self.loaded_at = loaded_at
+        self.version = f"{signature[0]:x}-{signature[1]:x}"
+        self.index_issues = []
+        self.by_char = self._build_index('unicode_char', lambda value: value)
+        self.by_id = self._build_index('id', lambda value: value)
+        self.by_name = self._build_index('name', normalize_name)
+        # /api/glyphs body, serialized and compressed once per version
+        self.payload = payload or PreparedPayload.from_json(glyphs)
+
+    def _build_index(self, key, normalize):
+        index = {}
+        for position, glyph in enumerate(self.glyphs):
+            value = glyph.get(key)
+            if value is None or value == '':
+                self.index_issues.append(f"glyph at position {position} has no {key}")
+                continue
+            value = normalize(value)
+            if value in index:
+                # First entry wins, matching the old linear scans
+                self.index_issues.append(f"duplicate {key} {value!r} at position {position}")
+                continue
+            index[value] = glyph
+        return index
+
+    def find_by_name(self, name):
+        return self.by_name.get(normalize_name(name))
+
+
+class CatalogStore:
+    """Loads glyph_catalog.json once per worker and shares it across requests.
+
+    The file is only re-read when its mtime or size changes. The change check
+    itself is a single stat() call, throttled to once per ``check_interval``
+    seconds, so the hot path never touches the file contents. When a fresh
+    compiled artifact is available, the catalog is taken from it instead.
+    """
+
+    def __init__(self, path, check_interval=2.0, artifact_path=None):
+        self.path = path
+        self.artifact_path = artifact_path
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._last_check = 0.0
+        self.load_count = 0
+        self.failed_loads = 0
+        self.last_load_seconds = None
+        self.last_error = None
+
+    def get(self):
+        """Returns the current snapshot, reloading it if the file changed."""
+        snapshot = self._snapshot
+        now = time.monotonic()
+        # Fast path: no lock, no syscall
+        if snapshot is not None and now - self._last_check < self.check_interval:
+            return snapshot
+
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is not None and now - self._last_check < self.check_interval:
+                return snapshot
+            self._last_check = now
+            try:
+                stat = os.stat(self.path)
+            except OSError as e:
+                self.last_error = str(e)
+                if snapshot is None:
+                    raise
+                return snapshot
+            signature = (stat.st_mtime_ns, stat.st_size)
+            if snapshot is None or snapshot.signature != signature:
+                snapshot = self._load(signature)
+            return snapshot
+
+    def _load(self, signature):
+        started = time.perf_counter()
+        try:
+            compiled = open_if_fresh(self.artifact_path, self.path, 'catalog')
+            if compiled is not None:
+                body = bytes(compiled.catalog_json)
+                compressed = {encoding: bytes(data) for encoding, data in compiled.catalog_variants.items()}
+                payload = PreparedPayload(body, compressed=compressed)
+                snapshot = CatalogSnapshot(json.loads(body), signature, time.time(), 'compiled', payload)
+            else:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    snapshot = CatalogSnapshot(json.load(f), signature, time.time())
+        except (OSError, ValueError) as e:
+            self.failed_loads += 1
+            self.last_error = str(e)
+            print(f"Catalog load failed: {e}")
+            if self._snapshot is None:
+                raise
+            # Keep serving the last good version until the file is fixed
+            return self._snapshot
+
+        # Publishing is a single reference swap, so readers never see a
+        # half-built catalog.
+        self._snapshot = snapshot
+        self.load_count += 1
+        self.last_load_seconds = time.perf_counter() - started
+        self.last_error = None
+        print(f"📜 Catalog loaded from {snapshot.source}: {len(snapshot.glyphs)} glyphs in {self.last_load_seconds * 1000:.1f}ms")
+        for issue in snapshot.index_issues:
+            print(f"    [Catalog index] {issue}")
+        return snapshot
+
+    def stats(self):
+        snapshot = self._snapshot
+        return {
+            "path": self.path,
+            "version": snapshot.version if snapshot else None,
+            "source": snapshot.source if snapshot else None,
+            "glyph_count": len(snapshot.glyphs) if snapshot else 0,
+            "index_issues": snapshot.index_issues if snapshot else [],
+            "payload_etag": snapshot.payload.digest if snapshot else None,
+            "payload_bytes": snapshot.payload.sizes() if snapshot else {},
+            "loaded_at": snapshot.loaded_at if snapshot else None,
+            "load_count": self.load_count,
+            "failed_loads": self.failed_loads,
+            "last_load_ms": round(self.last_load_seconds * 1000, 3) if self.last_load_seconds is not None else None,
+            "last_error": self.last_error,
+            "check_interval": self.check_interval,
+        }
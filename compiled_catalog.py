@@ -0,0 +1,212 @@
+"""Compiled, memory-mappable catalog artifact.
+
+``python compiled_catalog.py`` merges glyph_catalog.json and Unikemet.txt
+into one binary file (glyph_codex.bin by default). Workers mmap it read-only,
+so they share the same page-cache pages and start without parsing either
+source. The artifact records each source's size and mtime; a stale or
+missing artifact is ignored and the app falls back to the text sources.
+
+Layout (little-endian, sections 8-byte aligned):
+
+    header          HEADER struct below
+    code points     u32 x sign_count, ascending
+    sign table      u32 x sign_count x tag_count, string index or NO_VALUE
+    string offsets  u32 x (string_count + 1), offsets into the pool
+    string pool     UTF-8 bytes; strings 0..tag_count-1 are the tag names
+    catalog         compact JSON of glyph_catalog.json, then its gzip and
+                    brotli encodings (brotli is empty if unavailable)
+"""
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+
+from payloads import PreparedPayload
+from unikemet import UNIKEMET_TAGS, SignStore, UnikemetStore
+
+MAGIC = b'GLYPHCDX'
+FORMAT_VERSION = 1
+NO_VALUE = 0xFFFFFFFF
+DEFAULT_ARTIFACT_PATH = 'glyph_codex.bin'
+
+HEADER = struct.Struct(
+    '<8sII'     # magic, format version, tag count
+    'QqQq'      # catalog size, catalog mtime_ns, unikemet size, unikemet mtime_ns
+    'IIII'      # sign count, string count, glyph count, reserved
+    'QQQQQ'     # code points, sign table, string offsets, pool, pool length
+    'QQQQQQ'    # catalog, gzip and brotli catalog: offset and length of each
+)
+
+
+def source_signature(path):
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _align(buffer):
+    buffer.extend(b'\0' * (-len(buffer) % 8))
+    return len(buffer)
+
+
+def _u32_bytes(values):
+    values = array('I', values)
+    if sys.byteorder != 'little':
+        values.byteswap()
+    return values.tobytes()
+
+
+def compile_catalog(catalog_path, unikemet_path, out_path):
+    """Builds the artifact and atomically replaces ``out_path``."""
+    catalog_signature = source_signature(catalog_path)
+    unikemet_signature = source_signature(unikemet_path)
+
+    with open(catalog_path, 'r', encoding='utf-8') as f:
+        glyphs = json.load(f)
+    payload = PreparedPayload.from_json(glyphs)
+    store = UnikemetStore.from_file(unikemet_path)
+
+    string_index = {}
+    pool = bytearray()
+    offsets = [0]
+
+    def intern(value):
+        index = string_index.get(value)
+        if index is None:
+            index = string_index[value] = len(offsets) - 1
+            pool.extend(value.encode('utf-8'))
+            offsets.append(len(pool))
+        return index
+
+    for tag in UNIKEMET_TAGS:
+        intern(tag)
+    table = []
+    for row in range(len(store)):
+        for tag in UNIKEMET_TAGS:
+            value = store.raw_value(row, tag)
+            table.append(NO_VALUE if value is None else intern(value))
+
+    body = bytearray(b'\0' * HEADER.size)
+    sections = []
+    for data in (_u32_bytes(store.code_points), _u32_bytes(table), _u32_bytes(offsets), bytes(pool),
+                 payload.body, payload.variants['gzip'], payload.variants.get('br', b'')):
+        start = _align(body)
+        body.extend(data)
+        sections.append((start, len(data)))
+
+    HEADER.pack_into(
+        body, 0,
+        MAGIC, FORMAT_VERSION, len(UNIKEMET_TAGS),
+        catalog_signature[0], catalog_signature[1], unikemet_signature[0], unikemet_signature[1],
+        len(store), len(offsets) - 1, len(glyphs), 0,
+        sections[0][0], sections[1][0], sections[2][0], sections[3][0], sections[3][1],
+        sections[4][0], sections[4][1], sections[5][0], sections[5][1], sections[6][0], sections[6][1]
+    )
+
+    tmp_path = f"{out_path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(body)
+    os.replace(tmp_path, out_path)
+    if store.unknown_tags:
+        print(f"    [Compile] dropped unknown tags: {', '.join(sorted(store.unknown_tags))}")
+    return len(body), len(store), len(glyphs)
+
+
+class CompiledSignStore(SignStore):
+    """Sign store that reads rows straight out of the mapped artifact."""
+
+    def __init__(self, compiled):
+        self._compiled = compiled
+        self.code_points = compiled.code_points
+        self.unknown_tags = set()
+        self._core_rows = None
+        self._catalog_order = None
+        self._tag_columns = {tag: i for i, tag in enumerate(UNIKEMET_TAGS)}
+        self._tag_count = len(UNIKEMET_TAGS)
+
+    def raw_value(self, row, tag):
+        index = self._compiled.table[row * self._tag_count + self._tag_columns[tag]]
+        return None if index == NO_VALUE else self._compiled.string(index)
+
+    def approx_bytes(self):
+        # Rows live in the shared page cache, not on this worker's heap
+        return 0
+
+
+class CompiledCatalog:
+    """Read-only mmap view of a compiled artifact."""
+
+    def __init__(self, path):
+        if sys.byteorder != 'little' or array('I').itemsize != 4:
+            raise ValueError("Compiled catalog requires a little-endian platform with 32-bit array('I')")
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.path = path
+        self.size = len(self._mmap)
+        if self.size < HEADER.size:
+            raise ValueError(f"{path} is truncated")
+
+        (magic, version, tag_count,
+         catalog_size, catalog_mtime, unikemet_size, unikemet_mtime,
+         sign_count, string_count, self.glyph_count, _,
+         cp_off, table_off, offsets_off, pool_off, pool_len,
+         catalog_off, catalog_len, gzip_off, gzip_len, br_off, br_len) = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"{path} is not a version {FORMAT_VERSION} compiled catalog")
+        if br_off + br_len > self.size:
+            raise ValueError(f"{path} is truncated")
+
+        self.catalog_signature = (catalog_size, catalog_mtime)
+        self.unikemet_signature = (unikemet_size, unikemet_mtime)
+
+        view = memoryview(self._mmap)
+        self.code_points = view[cp_off:cp_off + 4 * sign_count].cast('I')
+        self.table = view[table_off:table_off + 4 * sign_count * tag_count].cast('I')
+        self._string_offsets = view[offsets_off:offsets_off + 4 * (string_count + 1)].cast('I')
+        self._pool = view[pool_off:pool_off + pool_len]
+        self.catalog_json = view[catalog_off:catalog_off + catalog_len]
+        self.catalog_variants = {'gzip': view[gzip_off:gzip_off + gzip_len]}
+        if br_len:
+            self.catalog_variants['br'] = view[br_off:br_off + br_len]
+
+        tags = tuple(self.string(i) for i in range(tag_count))
+        if tags != UNIKEMET_TAGS:
+            raise ValueError(f"{path} was compiled with different Unikemet tags")
+        self.signs = CompiledSignStore(self)
+
+    def string(self, index):
+        start = self._string_offsets[index]
+        return str(self._pool[start:self._string_offsets[index + 1]], 'utf-8')
+
+    def is_fresh(self, source_path, kind):
+        """True if the artifact was compiled from the current ``source_path``."""
+        signature = self.catalog_signature if kind == 'catalog' else self.unikemet_signature
+        try:
+            return source_signature(source_path) == signature
+        except OSError:
+            return False
+
+
+def open_if_fresh(path, source_path, kind):
+    """Returns a CompiledCatalog for ``path`` if it matches the source, else None."""
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        compiled = CompiledCatalog(path)
+    except (OSError, ValueError) as e:
+        print(f"Compiled catalog ignored: {e}")
+        return None
+    if not compiled.is_fresh(source_path, kind):
+        print(f"Compiled catalog {path} is stale for {source_path}; run python compiled_catalog.py")
+        return None
+    return compiled
+
+
+if __name__ == '__main__':
+    out_path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_ARTIFACT_PATH
+    started = time.perf_counter()
+    size, sign_count, glyph_count = compile_catalog('glyph_catalog.json', 'Unikemet.txt', out_path)
+    print(f"📜 Compiled {glyph_count} glyphs and {sign_count} signs into {out_path} "
+          f"({size / 1024:.0f} KiB) in {(time.perf_counter() - started) * 1000:.0f}ms")
@@ -0,0 +1,75 @@
+"""Static content served by the API: prompt templates, meditations, ...
+
+Each ``content/<name>.json`` file is a JSON array of objects with unique
+``id`` values. A collection is read on first use and never changes for the
+life of the worker, so its list body is serialized and compressed once,
+and so is each item the first time it is asked for.
+"""
+import json
+import os
+import threading
+
+from payloads import PreparedPayload
+
+
+class ContentCollection:
+    """One content file: its items, the prepared list body and per-item bodies."""
+
+    def __init__(self, name, items):
+        self.name = name
+        self.items = items
+        self.by_id = {}
+        for position, item in enumerate(items):
+            item_id = item.get('id') if isinstance(item, dict) else None
+            if not item_id:
+                raise ValueError(f"{name}: item at position {position} has no id")
+            if item_id in self.by_id:
+                raise ValueError(f"{name}: duplicate id {item_id!r}")
+            self.by_id[item_id] = item
+        self.payload = PreparedPayload.from_json(items)
+        self._item_payloads = {}
+
+    def item_payload(self, item_id):
+        """Returns the PreparedPayload for one item, or None if there is no such id."""
+        payload = self._item_payloads.get(item_id)
+        if payload is None:
+            item = self.by_id.get(item_id)
+            if item is None:
+                return None
+            # Racing requests may both build it; either result is the same bytes
+            payload = self._item_payloads[item_id] = PreparedPayload.from_json(item)
+        return payload
+
+
+class ContentRegistry:
+    """Loads collections from ``directory`` on first use and keeps them for good."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._collections = {}
+
+    def get(self, name):
+        collection = self._collections.get(name)
+        if collection is not None:
+            return collection
+        with self._lock:
+            collection = self._collections.get(name)
+            if collection is None:
+                path = os.path.join(self.directory, f"{name}.json")
+                with open(path, 'r', encoding='utf-8') as f:
+                    collection = ContentCollection(name, json.load(f))
+                self._collections[name] = collection
+                print(f"📜 Content loaded: {len(collection.items)} {name}")
+            return collection
+
+    def stats(self):
+        return {
+            name: {
+                "items": len(collection.items),
+                "prepared_items": len(collection._item_payloads),
+                "payload_etag": collection.payload.digest,
+                "payload_bytes": collection.payload.sizes(),
+            }
+            for name, collection in self._collections.items()
+        }
@@ -0,0 +1,181 @@
+"""Glyph engagement: a normalized child table plus incremental aggregates.
+
+`interaction_glyphs` has one row per (interaction, glyph), replacing the
+need to parse `related_glyphs` JSON to ask anything about glyphs.
+`glyph_stats` counts glyphs per action_type and `glyph_pairs` counts
+unordered glyph pairs engaged with in the same interaction. All three are
+written by an InteractionWriter hook in the insert transaction.
+
+Search results also carry related glyphs, often hundreds of them, so only
+interactions with at most ``MAX_PAIR_GLYPHS`` glyphs feed `glyph_pairs`.
+"""
+from collections import Counter
+from itertools import combinations
+
+from derived_tables import create_missing
+from ingest import inserted_ids
+
+GLYPH_TABLES = ('interaction_glyphs', 'glyph_stats', 'glyph_pairs')
+MAX_GLYPHS_PER_INTERACTION = 256
+MAX_PAIR_GLYPHS = 16
+
+GLYPH_SCHEMA = """
+CREATE TABLE IF NOT EXISTS interaction_glyphs (
+  interaction_id INTEGER NOT NULL,
+  glyph TEXT NOT NULL,
+  PRIMARY KEY (interaction_id, glyph)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_interaction_glyphs_glyph ON interaction_glyphs (glyph, interaction_id);
+
+CREATE TABLE IF NOT EXISTS glyph_stats (
+  glyph TEXT NOT NULL,
+  action_type TEXT NOT NULL,
+  count INTEGER NOT NULL,
+  PRIMARY KEY (glyph, action_type)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS glyph_pairs (
+  glyph_a TEXT NOT NULL,
+  glyph_b TEXT NOT NULL,
+  count INTEGER NOT NULL,
+  PRIMARY KEY (glyph_a, glyph_b)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_glyph_pairs_b ON glyph_pairs (glyph_b, glyph_a);
+"""
+
+UPSERT_GLYPH_STAT = (
+    'INSERT INTO glyph_stats (glyph, action_type, count) VALUES (?, ?, ?) '
+    'ON CONFLICT (glyph, action_type) DO UPDATE SET count = count + excluded.count'
+)
+UPSERT_GLYPH_PAIR = (
+    'INSERT INTO glyph_pairs (glyph_a, glyph_b, count) VALUES (?, ?, ?) '
+    'ON CONFLICT (glyph_a, glyph_b) DO UPDATE SET count = count + excluded.count'
+)
+
+# Backfill entirely in SQLite: json_each unpacks related_glyphs row by row.
+# Mirrors interaction_glyphs(): distinct trimmed strings, the first
+# MAX_GLYPHS_PER_INTERACTION of them in array order.
+BACKFILL_GLYPHS = (
+    'INSERT OR IGNORE INTO interaction_glyphs (interaction_id, glyph) '
+    'SELECT id, glyph FROM ('
+    '  SELECT id, glyph, ROW_NUMBER() OVER (PARTITION BY id ORDER BY position) AS n FROM ('
+    '    SELECT i.id, TRIM(j.value, char(32, 9, 10, 11, 12, 13)) AS glyph, MIN(j.key) AS position '
+    '    FROM interactions AS i, json_each(i.related_glyphs) AS j '
+    "    WHERE json_valid(i.related_glyphs) AND json_type(i.related_glyphs) = 'array' "
+    "    AND j.type = 'text' AND TRIM(j.value, char(32, 9, 10, 11, 12, 13)) != '' "
+    '    GROUP BY i.id, glyph)) '
+    'WHERE n <= ?'
+)
+BACKFILL_STATS = (
+    'INSERT INTO glyph_stats (glyph, action_type, count) '
+    'SELECT g.glyph, i.action_type, COUNT(*) FROM interaction_glyphs AS g '
+    'JOIN interactions AS i ON i.id = g.interaction_id GROUP BY g.glyph, i.action_type'
+)
+BACKFILL_PAIRS = (
+    'INSERT INTO glyph_pairs (glyph_a, glyph_b, count) '
+    'SELECT a.glyph, b.glyph, COUNT(*) FROM interaction_glyphs AS a '
+    'JOIN interaction_glyphs AS b ON b.interaction_id = a.interaction_id AND b.glyph > a.glyph '
+    'WHERE a.interaction_id IN (SELECT interaction_id FROM interaction_glyphs '
+    '                           GROUP BY interaction_id HAVING COUNT(*) <= ?) '
+    'GROUP BY a.glyph, b.glyph'
+)
+
+
+def interaction_glyphs(related_glyphs):
+    """Distinct, non-empty glyph strings from a related_glyphs value, in order."""
+    if not isinstance(related_glyphs, (list, tuple)):
+        return []
+    glyphs = dict.fromkeys(g.strip() for g in related_glyphs if isinstance(g, str) and g.strip())
+    return list(glyphs)[:MAX_GLYPHS_PER_INTERACTION]
+
+
+class GlyphEngagement:
+    """Keeps the glyph child table and its aggregates in step with `interactions`."""
+
+    def __init__(self):
+        self._ready = False
+
+    def ensure_schema(self, db):
+        """Creates missing glyph tables, backfilling them from existing history."""
+        if not self._ready:
+            create_missing(db, GLYPH_TABLES, GLYPH_SCHEMA, self.rebuild, 'Glyphs')
+            self._ready = True
+
+    def record(self, db, interactions):
+        """InteractionWriter hook: normalizes related_glyphs and updates the aggregates.
+
+        Child rows take the ids just assigned by the writer's INSERT.
+        """
+        rows = []
+        for interaction_id, interaction in zip(inserted_ids(db, len(interactions)), interactions):
+            rows.extend((interaction_id, glyph) for glyph in interaction_glyphs(interaction.related_glyphs))
+        if rows:
+            db.executemany('INSERT OR IGNORE INTO interaction_glyphs (interaction_id, glyph) VALUES (?, ?)', rows)
+        self.count(db, interactions)
+
+    def count(self, db, interactions):
+        """Adds interactions to `glyph_stats` and `glyph_pairs` only.
+
+        Used directly for archived interactions, which keep no child rows.
+        """
+        stats = Counter()
+        pairs = Counter()
+        for interaction in interactions:
+            glyphs = interaction_glyphs(interaction.related_glyphs)
+            for glyph in glyphs:
+                stats[(glyph, interaction.action_type)] += 1
+            if 1 < len(glyphs) <= MAX_PAIR_GLYPHS:
+                for pair in combinations(sorted(glyphs), 2):
+                    pairs[pair] += 1
+        if stats:
+            db.executemany(UPSERT_GLYPH_STAT, [(*key, n) for key, n in stats.items()])
+            db.executemany(UPSERT_GLYPH_PAIR, [(*pair, n) for pair, n in pairs.items()])
+
+    def forget(self, db, interaction_ids):
+        """RetentionManager hook: drops child rows of archived interactions.
+
+        The aggregates keep counting them, like the other rollups.
+        """
+        self.ensure_schema(db)
+        db.executemany('DELETE FROM interaction_glyphs WHERE interaction_id = ?',
+                       [(interaction_id,) for interaction_id in interaction_ids])
+
+    def rebuild(self, db):
+        """Recomputes all three tables from `interactions`; the caller commits."""
+        for table in GLYPH_TABLES:
+            db.execute(f'DELETE FROM {table}')
+        db.execute(BACKFILL_GLYPHS, (MAX_GLYPHS_PER_INTERACTION,))
+        db.execute(BACKFILL_STATS)
+        db.execute(BACKFILL_PAIRS, (MAX_PAIR_GLYPHS,))
+
+    def popular(self, db, limit=20, action_type=None):
+        """Returns the most engaged glyphs with a per-action_type breakdown."""
+        self.ensure_schema(db)
+        if action_type:
+            rows = db.execute(
+                'SELECT glyph, count AS total FROM glyph_stats WHERE action_type = ? '
+                'ORDER BY total DESC, glyph LIMIT ?', (action_type, limit)).fetchall()
+        else:
+            rows = db.execute(
+                'SELECT glyph, SUM(count) AS total FROM glyph_stats GROUP BY glyph '
+                'ORDER BY total DESC, glyph LIMIT ?', (limit,)).fetchall()
+        result = []
+        for glyph, total in rows:
+            by_action = dict(db.execute('SELECT action_type, count FROM glyph_stats WHERE glyph = ?', (glyph,)))
+            result.append({"glyph": glyph, "count": total, "by_action": by_action})
+        return result
+
+    def pairs(self, db, glyph=None, limit=20):
+        """Returns the most frequent pairs, or the partners of ``glyph``."""
+        self.ensure_schema(db)
+        if glyph is None:
+            rows = db.execute('SELECT glyph_a, glyph_b, count FROM glyph_pairs ORDER BY count DESC LIMIT ?',
+                              (limit,)).fetchall()
+            return [{"glyphs": [a, b], "count": count} for a, b, count in rows]
+        rows = db.execute(
+            'SELECT glyph_b, count FROM glyph_pairs WHERE glyph_a = :glyph '
+            'UNION ALL SELECT glyph_a, count FROM glyph_pairs WHERE glyph_b = :glyph '
+            'ORDER BY count DESC LIMIT :limit', {"glyph": glyph, "limit": limit}).fetchall()
+        return [{"glyph": partner, "count": count} for partner, count in rows]
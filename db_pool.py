@@ -0,0 +1,134 @@
+"""Per-worker SQLite connection pool.
+
+Connections are opened once, configured for WAL so `/api/history` readers
+never wait on the interaction writer, and handed out per request. Because a
+connection outlives the request, its prepared-statement cache does too: the
+same SELECT/INSERT text is compiled once per connection rather than once per
+request.
+"""
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+# Applied to every connection; journal_mode is persistent, the rest per connection
+DEFAULT_PRAGMAS = (
+    # Only applies to a new database, so it must precede journal_mode; existing
+    # ones switch with `flask --app codex_app retention-run --full-vacuum`
+    ('auto_vacuum', 'INCREMENTAL'),
+    ('journal_mode', 'WAL'),
+    # Durable across application crashes; only a power loss can drop the last commits
+    ('synchronous', 'NORMAL'),
+    ('cache_size', -8192),      # KiB, i.e. 8 MiB of page cache per connection
+    ('temp_store', 'MEMORY'),
+)
+
+
+class ConnectionPool:
+    """Hands out configured connections to request contexts, up to ``size``."""
+
+    def __init__(self, path, size=4, timeout=5.0, busy_timeout=5.0, cached_statements=256, pragmas=DEFAULT_PRAGMAS):
+        self.path = path
+        self.size = size
+        self.timeout = timeout
+        self.busy_timeout = busy_timeout
+        self.cached_statements = cached_statements
+        self.pragmas = pragmas
+        self._lock = threading.Lock()
+        self._pid = None
+        self._idle = None
+        self._created = 0
+        self.journal_mode = None
+        self.checkouts = 0
+        self.waits = 0
+        self.timeouts = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def connect(self):
+        """Opens a new configured connection that is not managed by the pool."""
+        db = sqlite3.connect(self.path, timeout=self.busy_timeout,
+                             check_same_thread=False, cached_statements=self.cached_statements)
+        for name, value in self.pragmas:
+            row = db.execute(f"PRAGMA {name} = {value}").fetchone()
+            if name == 'journal_mode' and row is not None:
+                self.journal_mode = row[0]
+        return db
+
+    def _idle_queue(self):
+        # Connections must not cross a fork; each gunicorn worker starts empty
+        pid = os.getpid()
+        if self._pid != pid:
+            with self._lock:
+                if self._pid != pid:
+                    self._idle = queue.LifoQueue()
+                    self._created = 0
+                    self._pid = pid
+        return self._idle
+
+    def checkout(self):
+        """Returns an idle connection, opening one if under ``size``, else waits."""
+        idle = self._idle_queue()
+        started = time.perf_counter()
+        try:
+            db = idle.get_nowait()
+        except queue.Empty:
+            db = None
+            with self._lock:
+                create = self._created < self.size
+                if create:
+                    self._created += 1
+            if create:
+                try:
+                    db = self.connect()
+                except Exception:
+                    with self._lock:
+                        self._created -= 1
+                    raise
+                db.row_factory = sqlite3.Row
+            else:
+                self.waits += 1
+                try:
+                    db = idle.get(timeout=self.timeout)
+                except queue.Empty:
+                    self.timeouts += 1
+                    raise sqlite3.OperationalError(
+                        f"No database connection free after {self.timeout}s (pool size {self.size})")
+
+        waited = time.perf_counter() - started
+        self.checkouts += 1
+        self.total_wait_seconds += waited
+        self.max_wait_seconds = max(self.max_wait_seconds, waited)
+        return db
+
+    def checkin(self, db):
+        """Returns a connection to the pool, discarding any uncommitted work."""
+        if self._pid != os.getpid():
+            return
+        try:
+            if db.in_transaction:
+                db.rollback()
+        except sqlite3.Error:
+            db.close()
+            with self._lock:
+                self._created -= 1
+            return
+        self._idle.put(db)
+
+    def stats(self):
+        idle = self._idle.qsize() if self._idle is not None else 0
+        return {
+            "path": self.path,
+            "journal_mode": self.journal_mode,
+            "size": self.size,
+            "open": self._created,
+            "idle": idle,
+            "in_use": self._created - idle,
+            "cached_statements": self.cached_statements,
+            "checkouts": self.checkouts,
+            "waits": self.waits,
+            "timeouts": self.timeouts,
+            "max_wait_ms": round(self.max_wait_seconds * 1000, 3),
+            "avg_wait_ms": round(self.total_wait_seconds / self.checkouts * 1000, 3) if self.checkouts else None,
+        }
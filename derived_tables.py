@@ -0,0 +1,40 @@
+"""Tables derived from the interaction stream rather than written directly.
+
+Each owning module defines its tables' DDL once, in a constant.
+``create_missing`` builds them from it on first use; ``schema.sql`` only
+drops them, and ``init_db`` recreates them, empty, from the same constants.
+"""
+
+
+def execute_schema(db, schema):
+    """Runs DDL statement by statement, leaving the caller's transaction open.
+
+    executescript() would commit it, and a writer prepare step runs inside
+    the insert transaction.
+    """
+    for statement in schema.split(';'):
+        if statement.strip():
+            db.execute(statement)
+
+
+def create_missing(db, tables, schema, rebuild, label):
+    """Creates ``tables`` if any is missing and backfills them with ``rebuild(db)``.
+
+    ``rebuild`` is None for tables that start out empty.
+    Commits unless the caller already has a transaction open, in which
+    case it covers this too. Returns whether anything was created.
+    """
+    present = {row[0] for row in db.execute(
+        f"SELECT name FROM sqlite_master WHERE type = 'table' AND name IN ({', '.join('?' * len(tables))})",
+        tables)}
+    if len(present) == len(tables):
+        return False
+    owns_transaction = not db.in_transaction
+    execute_schema(db, schema)
+    if rebuild is not None:
+        rebuild(db)
+    if owns_transaction:
+        db.commit()
+    done = 'created' if rebuild is None else 'created and backfilled'
+    print(f"    [{label}] {done} {', '.join(tables)}")
+    return True
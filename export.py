@@ -0,0 +1,75 @@
+"""Streaming export of the interaction log as NDJSON or CSV.
+
+Rows are read with ``fetchmany`` from one cursor and encoded a chunk at a
+time, optionally through a streaming gzip compressor, so memory stays flat
+whatever the size of the table. Used by /api/export and
+``flask --app codex_app export-interactions``.
+"""
+import csv
+import io
+import json
+import zlib
+
+from history import HISTORY_COLUMNS, filter_clauses
+
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+DEFAULT_CHUNK_SIZE = 1000
+
+
+def iter_chunks(db, action_types=None, since=None, until=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yields lists of row tuples in (timestamp, id) order."""
+    clauses, params = filter_clauses(action_types, since, until)
+    query = f"SELECT {', '.join(HISTORY_COLUMNS)} FROM interactions"
+    if clauses:
+        query += ' WHERE ' + ' AND '.join(clauses)
+    cursor = db.execute(query + ' ORDER BY timestamp, id', params)
+    try:
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                return
+            yield rows
+    finally:
+        cursor.close()
+
+
+def encode_ndjson(chunks):
+    for rows in chunks:
+        yield ''.join(json.dumps(dict(zip(HISTORY_COLUMNS, row)), ensure_ascii=False) + '\n'
+                      for row in rows).encode('utf-8')
+
+
+def encode_csv(chunks):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(HISTORY_COLUMNS)
+    for rows in chunks:
+        writer.writerows(rows)
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+
+def gzip_stream(blocks, level=6):
+    """Wraps byte blocks in one gzip member, emitting output as it is produced."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for block in blocks:
+        compressed = compressor.compress(block)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def export_stream(db, fmt='ndjson', compress=False, action_types=None, since=None, until=None,
+                  chunk_size=DEFAULT_CHUNK_SIZE):
+    """Returns an iterator of encoded bytes for the filtered interaction log."""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format {fmt!r}; expected one of {', '.join(EXPORT_FORMATS)}")
+    chunks = iter_chunks(db, action_types, since, until, chunk_size)
+    blocks = encode_ndjson(chunks) if fmt == 'ndjson' else encode_csv(chunks)
+    return gzip_stream(blocks) if compress else blocks
@@ -0,0 +1,106 @@
+"""Keyset pagination over the interaction log.
+
+Pages are ordered newest first by (timestamp, id) and continue from an
+opaque cursor holding the last row's key. Every query is a range scan
+on one of the indexes below, so the cost of a page does not depend on how
+deep into the history it is.
+"""
+import base64
+from datetime import datetime
+
+HISTORY_COLUMNS = ('id', 'timestamp', 'action_type', 'user_input', 'system_response',
+                   'related_glyphs', 'context_summary')
+
+HISTORY_INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_interactions_timestamp ON interactions (timestamp DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_interactions_action_timestamp ON interactions (action_type, timestamp DESC, id DESC);
+"""
+
+
+class HistoryIndexes:
+    """Adds the history indexes to databases created before they existed."""
+
+    def __init__(self):
+        self._ready = False
+
+    def ensure_schema(self, db):
+        if not self._ready:
+            db.executescript(HISTORY_INDEXES)
+            self._ready = True
+
+
+def encode_cursor(timestamp, row_id):
+    return base64.urlsafe_b64encode(f"{timestamp}|{row_id}".encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Returns (timestamp, id) from a cursor; raises ValueError if malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode('utf-8')
+        timestamp, row_id = raw.rsplit('|', 1)
+        return timestamp, int(row_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid cursor {cursor!r}") from e
+
+
+def parse_time(value):
+    """Normalizes an ISO 8601 time to the text form stored in `interactions`.
+
+    Stored timestamps are naive server local time, so a time with an
+    offset is converted to that before it is compared with them.
+    """
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError as e:
+        raise ValueError(f"Invalid time {value!r}; expected ISO 8601") from e
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone().replace(tzinfo=None)
+    return parsed.isoformat(' ')
+
+
+def filter_clauses(action_types=None, since=None, until=None):
+    """Returns (WHERE clauses, params) for the shared interaction filters."""
+    clauses = []
+    params = []
+    if action_types:
+        clauses.append(f"action_type IN ({', '.join('?' * len(action_types))})")
+        params.extend(action_types)
+    if since is not None:
+        clauses.append('timestamp >= ?')
+        params.append(since)
+    if until is not None:
+        clauses.append('timestamp < ?')
+        params.append(until)
+    return clauses, params
+
+
+def history_page(db, limit=50, cursor=None, action_types=None, since=None, until=None, fields=None):
+    """Returns (rows as dicts, next cursor or None) for one page, newest first.
+
+    ``since`` is inclusive and ``until`` exclusive; both are stored-form
+    timestamps. ``fields`` restricts the returned columns.
+    """
+    columns = [c for c in HISTORY_COLUMNS if fields is None or c in fields or c in ('id', 'timestamp')]
+    clauses, params = filter_clauses(action_types, since, until)
+    if cursor is not None:
+        clauses.append('(timestamp, id) < (?, ?)')
+        params.extend(decode_cursor(cursor))
+
+    query = f"SELECT {', '.join(columns)} FROM interactions"
+    if clauses:
+        query += ' WHERE ' + ' AND '.join(clauses)
+    query += ' ORDER BY timestamp DESC, id DESC LIMIT ?'
+    params.append(limit + 1)
+    rows = db.execute(query, params).fetchall()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]['timestamp'], rows[-1]['id'])
+    items = []
+    for row in rows:
+        item = dict(row)
+        if fields is not None:
+            item = {key: value for key, value in item.items() if key in fields}
+        items.append(item)
+    return items, next_cursor
@@ -0,0 +1,300 @@
+"""Interaction ingestion: the single path by which rows reach `interactions`.
+
+In ``batched`` mode (the default) events go into a bounded in-process queue
+and a background thread writes them in multi-row transactions, flushing when
+``batch_size`` events are waiting or ``flush_interval`` seconds have passed
+since the oldest one arrived. ``sync`` mode keeps the old behaviour of one
+commit per request.
+
+Hooks registered on the writer run inside the same transaction as the
+INSERT, so derived tables never disagree with the log.
+"""
+import atexit
+import json
+import os
+import queue
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+Interaction = namedtuple(
+    'Interaction',
+    'timestamp action_type user_input system_response related_glyphs context_summary'
+)
+
+INSERT_INTERACTION = (
+    'INSERT INTO interactions (timestamp, action_type, user_input, system_response, related_glyphs, context_summary) '
+    'VALUES (?, ?, ?, ?, ?, ?)'
+)
+
+DURABILITY_MODES = ('batched', 'sync')
+
+# Upper bound on events per bulk request, and on how long a client may buffer one
+MAX_BATCH_EVENTS = 500
+MAX_EVENT_AGE_MS = 60 * 60 * 1000
+
+# Stored as given, so they must be values sqlite3 can bind
+TEXT_FIELDS = ('user_input', 'system_response', 'context_summary')
+SCALAR_TYPES = (str, int, float, bool, type(None))
+
+_STOP = object()
+
+
+def interaction_from_json(data, timestamp=None):
+    """Builds an Interaction from a request body; raises ValueError if it cannot be stored.
+
+    Checked here, before queueing, because a row the INSERT rejects at
+    flush time would take its whole batch down with it.
+    """
+    if not isinstance(data, dict):
+        raise ValueError("Expected a JSON object")
+    if not isinstance(data.get('action_type'), str) or not data['action_type']:
+        raise ValueError("action_type must be a non-empty string")
+    for field in TEXT_FIELDS:
+        if not isinstance(data.get(field), SCALAR_TYPES):
+            raise ValueError(f"{field} must be a string, number, boolean or null")
+    return Interaction(
+        timestamp or datetime.now(),
+        data.get('action_type'),
+        data.get('user_input'),
+        data.get('system_response'),
+        data.get('related_glyphs'),
+        data.get('context_summary')
+    )
+
+
+def interactions_from_batch(events, received_at=None):
+    """Returns (interactions, rejected indexes) for a bulk request body.
+
+    An event interaction_from_json would refuse is rejected on its own, so
+    it never reaches the write-behind batch. Clients buffer events before
+    sending, so each may carry ``age_ms``: how long ago it happened
+    relative to the send. Timestamps come from the server clock minus that
+    age, never from the client's clock.
+    """
+    received_at = received_at or datetime.now()
+    interactions = []
+    rejected = []
+    for index, event in enumerate(events):
+        try:
+            age_ms = min(max(int(event.get('age_ms') or 0), 0), MAX_EVENT_AGE_MS)
+        except (AttributeError, TypeError, ValueError):
+            age_ms = 0
+        try:
+            interactions.append(interaction_from_json(event, received_at - timedelta(milliseconds=age_ms)))
+        except ValueError:
+            rejected.append(index)
+    return interactions, rejected
+
+
+def interaction_row(interaction):
+    return (
+        # Same text the sqlite3 datetime adapter has always produced
+        interaction.timestamp.isoformat(' '),
+        interaction.action_type,
+        interaction.user_input,
+        interaction.system_response,
+        json.dumps(interaction.related_glyphs),
+        interaction.context_summary
+    )
+
+
+def inserted_ids(db, count):
+    """Row ids of the last ``count`` interactions inserted in this transaction.
+
+    `interactions` is AUTOINCREMENT and a write transaction holds the write
+    lock, so one executemany's rows get consecutive ids ending at the
+    table's sqlite_sequence value.
+    """
+    last = db.execute("SELECT seq FROM sqlite_sequence WHERE name = 'interactions'").fetchone()[0]
+    return range(last - count + 1, last + 1)
+
+
+class InteractionWriter:
+    """Accepts interactions and persists them in sync or write-behind mode."""
+
+    def __init__(self, connect, mode='batched', max_queue=10000, batch_size=200, flush_interval=1.0):
+        if mode not in DURABILITY_MODES:
+            raise ValueError(f"Unknown durability mode {mode!r}; expected one of {', '.join(DURABILITY_MODES)}")
+        self.connect = connect
+        self.mode = mode
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.hooks = []
+        self.prepares = []
+        self._lock = threading.Lock()
+        self._queue = None
+        self._thread = None
+        self._pid = None
+        self.enqueued = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.flushes = 0
+        self.last_flush_seconds = None
+        self.max_flush_seconds = 0.0
+        self.total_flush_seconds = 0.0
+        atexit.register(self.close)
+
+    def add_hook(self, hook, prepare=None):
+        """Registers hook(db, interactions), run in the same transaction as the INSERT.
+
+        ``prepare(db)`` runs before the INSERT, so a hook's tables can be
+        created and backfilled without counting the batch being written.
+        """
+        self.hooks.append(hook)
+        if prepare is not None:
+            self.prepares.append(prepare)
+
+    def write(self, db, interactions):
+        """Inserts a batch and runs hooks; the caller owns the transaction."""
+        for prepare in self.prepares:
+            prepare(db)
+        db.executemany(INSERT_INTERACTION, [interaction_row(i) for i in interactions])
+        for hook in self.hooks:
+            hook(db, interactions)
+
+    def submit(self, interactions, get_db):
+        """Records interactions; returns False if they had to be dropped.
+
+        ``get_db`` is only called in sync mode, so batched requests never
+        touch the database.
+        """
+        if self.mode == 'sync':
+            db = get_db()
+            started = time.perf_counter()
+            try:
+                self.write(db, interactions)
+                db.commit()
+            except Exception:
+                db.rollback()
+                self.failed += len(interactions)
+                raise
+            self._record_flush(len(interactions), time.perf_counter() - started)
+            return True
+
+        q = self._ensure_started()
+        accepted = True
+        for interaction in interactions:
+            try:
+                q.put_nowait(interaction)
+                self.enqueued += 1
+            except queue.Full:
+                self.dropped += 1
+                accepted = False
+        return accepted
+
+    def _ensure_started(self):
+        # Started lazily so each forked gunicorn worker gets its own thread
+        pid = os.getpid()
+        if self._thread is not None and self._pid == pid:
+            return self._queue
+        with self._lock:
+            if self._thread is None or self._pid != pid:
+                self._queue = queue.Queue(maxsize=self.max_queue)
+                self._pid = pid
+                self._thread = threading.Thread(target=self._run, args=(self._queue,),
+                                                name='interaction-writer', daemon=True)
+                self._thread.start()
+            return self._queue
+
+    def _run(self, q):
+        db = self.connect()
+        try:
+            stopping = False
+            while not stopping:
+                item = q.get()
+                if item is _STOP:
+                    break
+                batch = [item]
+                deadline = time.monotonic() + self.flush_interval
+                while len(batch) < self.batch_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        item = q.get(timeout=remaining)
+                    except queue.Empty:
+                        break
+                    if item is _STOP:
+                        stopping = True
+                        break
+                    batch.append(item)
+                self._flush(db, batch)
+
+            # Shutdown: write whatever is still queued
+            leftover = []
+            while True:
+                try:
+                    item = q.get_nowait()
+                except queue.Empty:
+                    break
+                if item is not _STOP:
+                    leftover.append(item)
+            for start in range(0, len(leftover), self.batch_size):
+                self._flush(db, leftover[start:start + self.batch_size])
+        finally:
+            db.close()
+
+    def _flush(self, db, batch):
+        started = time.perf_counter()
+        try:
+            with db:
+                self.write(db, batch)
+        except Exception as e:
+            print(f"Interaction flush failed, retrying {len(batch)} events one at a time: {e}")
+            self._flush_each(db, batch, started)
+            return
+        self._record_flush(len(batch), time.perf_counter() - started)
+
+    def _flush_each(self, db, batch, started):
+        """Writes a failed batch row by row, so one bad event loses only itself."""
+        written = 0
+        for interaction in batch:
+            try:
+                with db:
+                    self.write(db, [interaction])
+                written += 1
+            except Exception as e:
+                self.failed += 1
+                print(f"Interaction write failed, event lost: {e}")
+        if written:
+            self._record_flush(written, time.perf_counter() - started)
+
+    def _record_flush(self, count, seconds):
+        self.written += count
+        self.flushes += 1
+        self.last_flush_seconds = seconds
+        self.total_flush_seconds += seconds
+        self.max_flush_seconds = max(self.max_flush_seconds, seconds)
+
+    def close(self, timeout=5.0):
+        """Flushes queued events and stops the writer thread."""
+        thread = self._thread
+        if thread is None or self._pid != os.getpid() or not thread.is_alive():
+            return
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            print("Interaction writer did not drain before shutdown")
+            return
+        thread.join(timeout)
+
+    def stats(self):
+        return {
+            "mode": self.mode,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "max_queue": self.max_queue,
+            "batch_size": self.batch_size,
+            "flush_interval": self.flush_interval,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "flushes": self.flushes,
+            "last_flush_ms": round(self.last_flush_seconds * 1000, 3) if self.last_flush_seconds is not None else None,
+            "max_flush_ms": round(self.max_flush_seconds * 1000, 3),
+            "avg_flush_ms": round(self.total_flush_seconds / self.flushes * 1000, 3) if self.flushes else None,
+        }
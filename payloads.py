@@ -0,0 +1,70 @@
+import gzip
+import hashlib
+import json
+
+from flask import Response, request
+
+try:
+    import brotli
+except ImportError:  # Optional: responses fall back to gzip/identity
+    brotli = None
+
+
+class PreparedPayload:
+    """A response body serialized and compressed once, then served as bytes."""
+
+    def __init__(self, body, mimetype='application/json', compressed=None):
+        self.body = body
+        self.mimetype = mimetype
+        self.digest = hashlib.sha256(body).hexdigest()[:32]
+        self.variants = {'identity': body}
+        if compressed is not None:
+            # Encodings prepared ahead of time, e.g. by compiled_catalog.py
+            self.variants.update(compressed)
+            return
+        self.variants['gzip'] = gzip.compress(body, compresslevel=9, mtime=0)
+        if brotli is not None:
+            self.variants['br'] = brotli.compress(body, quality=11)
+
+    @classmethod
+    def from_json(cls, data):
+        body = json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        return cls(body)
+
+    def etag(self, encoding):
+        # Each encoding is a different representation, so each gets its own
+        # strong validator.
+        return self.digest if encoding == 'identity' else f"{self.digest}-{encoding}"
+
+    def sizes(self):
+        return {encoding: len(body) for encoding, body in self.variants.items()}
+
+
+def choose_encoding(payload):
+    accepted = request.accept_encodings
+    for encoding in ('br', 'gzip'):
+        if encoding in payload.variants and accepted[encoding]:
+            return encoding
+    return 'identity'
+
+
+def payload_response(payload, cache_control='no-cache'):
+    """Serves a PreparedPayload with ETag/If-None-Match and precompressed bodies."""
+    encoding = choose_encoding(payload)
+    etag = payload.etag(encoding)
+
+    # If-None-Match uses weak comparison (RFC 9110 13.1.2), so a W/ tag from a
+    # proxy that re-encoded the body still revalidates. A tag of another
+    # encoding's variant gets a 200 with the selected one, since a 304 would
+    # pair the client's cached variant with this variant's validator.
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+    else:
+        response = Response(payload.variants[encoding], mimetype=payload.mimetype)
+        if encoding != 'identity':
+            response.headers['Content-Encoding'] = encoding
+
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = cache_control
+    response.headers['Vary'] = 'Accept-Encoding'
+    return response
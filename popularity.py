@@ -0,0 +1,115 @@
+"""Engagement-based popularity for search ranking.
+
+A background job reads `glyph_stats` (see cooccurrence.py) every
+``interval`` seconds and turns the weighted engagement counts into a
+score in [0, 1] per glyph. The first query after a refresh or an index
+rebuild aligns them into an ``array('f')`` indexed by document, published
+by swapping one reference; after that the search path reads it without
+locks or database work.
+"""
+import math
+import os
+import threading
+import time
+from array import array
+
+# How much each kind of engagement says about a glyph's appeal. Searches
+# only record which glyphs were shown, so they count for little, and
+# keep the ranking from simply reinforcing itself.
+ENGAGEMENT_WEIGHTS = {
+    'glyph_copy': 3.0,
+    'stream_created': 2.0,
+    'prompt_generated': 2.0,
+    'wisdom_received': 0.5,
+    'glyph_search': 0.1,
+}
+
+
+class PopularityScores:
+    """Per-glyph popularity, refreshed in the background and read lock-free."""
+
+    def __init__(self, connect, interval=300.0):
+        self.connect = connect
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._scores = {}
+        # (SearchIndex, scores dict, per-document array), replaced as a whole
+        self._boosts = (None, None, None)
+        self._thread = None
+        self._pid = None
+        self.refreshes = 0
+        self.last_refresh = None
+        self.last_refresh_seconds = None
+        self.last_error = None
+
+    def ensure_started(self):
+        pid = os.getpid()
+        if self._thread is not None and self._pid == pid:
+            return
+        with self._lock:
+            if self._thread is None or self._pid != pid:
+                self._pid = pid
+                self._thread = threading.Thread(target=self._run, name='popularity-refresh', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            try:
+                self.refresh()
+            except Exception as e:
+                self.last_error = str(e)
+                print(f"Popularity refresh failed: {e}")
+            time.sleep(self.interval)
+
+    def refresh(self):
+        """Recomputes glyph scores from `glyph_stats`."""
+        started = time.perf_counter()
+        db = self.connect()
+        try:
+            table = db.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'glyph_stats'").fetchone()
+            rows = db.execute('SELECT glyph, action_type, count FROM glyph_stats').fetchall() if table else []
+        finally:
+            db.close()
+
+        weighted = {}
+        for glyph, action_type, count in rows:
+            weight = ENGAGEMENT_WEIGHTS.get(action_type, 0.0)
+            if weight:
+                weighted[glyph] = weighted.get(glyph, 0.0) + weight * count
+        # log scale so a handful of runaway glyphs do not flatten the rest
+        top = max((math.log1p(value) for value in weighted.values()), default=0.0)
+        self._scores = {glyph: math.log1p(value) / top for glyph, value in weighted.items()} if top else {}
+
+        self.refreshes += 1
+        self.last_refresh = time.time()
+        self.last_refresh_seconds = time.perf_counter() - started
+        self.last_error = None
+
+    def boosts(self, index):
+        """Returns per-document scores aligned with ``index``, or None if there are none."""
+        scores = self._scores
+        built_for, built_from, boosts = self._boosts
+        if built_for is index and built_from is scores:
+            return boosts
+        if not scores:
+            return None
+        # The catalog or the scores changed since the last query; realign once
+        boosts = array('f', bytes(4 * len(index)))
+        for doc, key in enumerate(index.keys):
+            score = scores.get(key)
+            if score:
+                boosts[doc] = score
+        self._boosts = (index, scores, boosts)
+        return boosts
+
+    def stats(self):
+        return {
+            "interval": self.interval,
+            "glyphs": len(self._scores),
+            "refreshes": self.refreshes,
+            "last_refresh": self.last_refresh,
+            "last_refresh_ms": round(self.last_refresh_seconds * 1000, 3)
+            if self.last_refresh_seconds is not None else None,
+            "last_error": self.last_error,
+        }
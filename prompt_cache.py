@@ -0,0 +1,224 @@
+"""Memoized /api/generate_glyph_prompt responses.
+
+A response is a pure function of the resolved glyph sequence, the prompt
+type, the catalog version and the code that renders it, so the serialized
+body is kept in an LRU bounded by total bytes. The whole cache is dropped
+the first time a lookup sees a new catalog version.
+
+With a ``disk_path``, entries that are hit a second time are also written
+to a small SQLite file. After a restart a memory miss falls back to it,
+so hot sequences skip generation from the first request. Disk rows are
+stored under the catalog version and ``code_version``, a digest of the
+prompt code, so a deploy with new templates never reads old bodies.
+`prompt_cache_versions` records when each version was first seen; a
+worker switching versions deletes only rows of versions seen before its
+own, so workers still on an older version never delete newer rows.
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+DISK_SCHEMA = """
+CREATE TABLE IF NOT EXISTS prompt_cache (
+  version TEXT NOT NULL,
+  key TEXT NOT NULL,
+  body BLOB NOT NULL,
+  stored_at REAL NOT NULL,
+  PRIMARY KEY (version, key)
+);
+CREATE TABLE IF NOT EXISTS prompt_cache_versions (
+  version TEXT PRIMARY KEY,
+  first_seen REAL NOT NULL
+) WITHOUT ROWID;
+"""
+
+# Version rows stay behind, so a worker still on an old version cannot
+# register it again as the newest
+DELETE_OLDER_VERSIONS = """
+DELETE FROM prompt_cache WHERE version IN (
+  SELECT version FROM prompt_cache_versions
+  WHERE first_seen < (SELECT first_seen FROM prompt_cache_versions WHERE version = ?))
+"""
+
+# Hits an entry needs in memory before it is written to disk
+DISK_PROMOTE_HITS = 1
+
+
+def code_version(*paths):
+    """Digest of the source files that shape a prompt response."""
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+def cache_key(prompt_type, glyph_details):
+    # unicode_char values can be more than one code point, so separate them
+    return '\x1f'.join([prompt_type] + [g['unicode_char'] for g in glyph_details])
+
+
+class PromptCache:
+    """Byte-bounded LRU of response bodies, with an optional disk tier."""
+
+    def __init__(self, max_bytes=8 * 1024 * 1024, disk_path=None, disk_max_entries=2000, code_version=''):
+        self.max_bytes = max_bytes
+        self.code_version = code_version
+        self.disk_path = disk_path or None
+        self.disk_max_entries = disk_max_entries
+        self._lock = threading.Lock()
+        self._disk_lock = threading.Lock()
+        # key -> [body, hits, size in bytes]; most recently used last
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._version = None
+        self._disk = None
+        self._disk_pid = None
+        self._disk_version = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.too_large = 0
+        self.disk_hits = 0
+        self.disk_writes = 0
+        self.last_disk_error = None
+
+    def _check_version(self, version):
+        # Caller holds the lock
+        if version != self._version:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self._bytes = 0
+            self._version = version
+
+    def get(self, version, key):
+        """Returns the cached body for ``key`` under ``version``, or None."""
+        promote = None
+        with self._lock:
+            self._check_version(version)
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                entry[1] += 1
+                self.hits += 1
+                if entry[1] == DISK_PROMOTE_HITS and self.disk_path:
+                    promote = entry[0]
+                body = entry[0]
+        if entry is not None:
+            if promote is not None:
+                self._disk_put(version, key, promote)
+            return body
+
+        body = self._disk_get(version, key)
+        with self._lock:
+            if body is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            # Already on disk, so do not write it back when it is hit again
+            self._store(key, body, hits=DISK_PROMOTE_HITS)
+        return body
+
+    def put(self, version, key, body):
+        with self._lock:
+            self._check_version(version)
+            self._store(key, body, hits=0)
+
+    def _store(self, key, body, hits):
+        # Caller holds the lock
+        size = len(key.encode('utf-8')) + len(body)
+        if size > self.max_bytes:
+            self.too_large += 1
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= old[2]
+        self._entries[key] = [body, hits, size]
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            _, (_, _, old_size) = self._entries.popitem(last=False)
+            self._bytes -= old_size
+            self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    # --- Disk tier ---
+
+    def _disk_version_of(self, version):
+        return f"{version}:{self.code_version}"
+
+    def _disk_connection(self, version):
+        # Caller holds the disk lock. Connections must not cross a fork.
+        pid = os.getpid()
+        if self._disk is None or self._disk_pid != pid:
+            db = sqlite3.connect(self.disk_path, timeout=1.0, check_same_thread=False)
+            db.execute('PRAGMA journal_mode = WAL')
+            db.execute('PRAGMA synchronous = NORMAL')
+            columns = {row[1] for row in db.execute('PRAGMA table_info(prompt_cache)')}
+            if columns and 'version' not in columns:
+                # Written before rows carried the code version; it is only a cache
+                db.execute('DROP TABLE prompt_cache')
+            db.executescript(DISK_SCHEMA)
+            self._disk, self._disk_pid, self._disk_version = db, pid, None
+        disk_version = self._disk_version_of(version)
+        if disk_version != self._disk_version:
+            with self._disk:
+                self._disk.execute('INSERT OR IGNORE INTO prompt_cache_versions (version, first_seen) VALUES (?, ?)',
+                                   (disk_version, time.time()))
+                self._disk.execute(DELETE_OLDER_VERSIONS, (disk_version,))
+            self._disk_version = disk_version
+        return self._disk
+
+    def _disk_get(self, version, key):
+        if not self.disk_path:
+            return None
+        try:
+            with self._disk_lock:
+                row = self._disk_connection(version).execute(
+                    'SELECT body FROM prompt_cache WHERE version = ? AND key = ?',
+                    (self._disk_version_of(version), key)).fetchone()
+        except sqlite3.Error as e:
+            self.last_disk_error = str(e)
+            return None
+        return bytes(row[0]) if row else None
+
+    def _disk_put(self, version, key, body):
+        try:
+            with self._disk_lock:
+                db = self._disk_connection(version)
+                with db:
+                    db.execute('INSERT OR REPLACE INTO prompt_cache (version, key, body, stored_at) '
+                               'VALUES (?, ?, ?, ?)', (self._disk_version_of(version), key, body, time.time()))
+                    db.execute('DELETE FROM prompt_cache WHERE rowid IN (SELECT rowid FROM prompt_cache '
+                               'ORDER BY stored_at DESC LIMIT -1 OFFSET ?)', (self.disk_max_entries,))
+                self.disk_writes += 1
+        except sqlite3.Error as e:
+            self.last_disk_error = str(e)
+
+    def stats(self):
+        return {
+            "catalog_version": self._version,
+            "code_version": self.code_version,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "too_large": self.too_large,
+            "disk": {
+                "path": self.disk_path,
+                "hits": self.disk_hits,
+                "writes": self.disk_writes,
+                "last_error": self.last_disk_error,
+            } if self.disk_path else None,
+        }
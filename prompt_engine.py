@@ -0,0 +1,145 @@
+"""Precompiled prompt templates.
+
+A template is plain text with ``{slot}`` placeholders. It is split once,
+at registration, into static segments and slot functions; rendering is a
+single ``''.join`` over the segments and each slot's value, and every slot
+is evaluated at most once per render however often it appears.
+
+Slot functions receive a PromptContext. Text that depends on one glyph
+only (a breakdown line, a meditation stage) goes through
+``context.fragment()``, which caches it per glyph until the catalog
+version changes.
+"""
+import re
+import threading
+
+SLOT_PATTERN = re.compile(r"\{(\w+)\}")
+# A section starts at every level 2 or 3 markdown heading
+SECTION_BREAK = re.compile(r"\n(?=#{2,3} )")
+
+
+class PromptTemplate:
+    """Template text compiled into static segments and slot functions."""
+
+    def __init__(self, name, source, slots):
+        parts = SLOT_PATTERN.split(source)
+        self.name = name
+        self.segments = parts[0::2]
+        self.slot_names = parts[1::2]
+        missing = set(self.slot_names) - set(slots)
+        if missing:
+            raise ValueError(f"Template {name!r} has no slot function for: {', '.join(sorted(missing))}")
+        self.slots = slots
+
+    def render(self, context):
+        return ''.join(self.iter_render(context))
+
+    def iter_render(self, context):
+        """Yields the output piece by piece, evaluating each slot when it is reached."""
+        values = {}
+        yield self.segments[0]
+        for slot, segment in zip(self.slot_names, self.segments[1:]):
+            value = values.get(slot)
+            if value is None:
+                value = values[slot] = self.slots[slot](context)
+            yield value
+            yield segment
+
+    def iter_sections(self, context):
+        """Yields the output split before each ``##``/``###`` heading; joined, it equals render()."""
+        pending = ''
+        for piece in self.iter_render(context):
+            parts = SECTION_BREAK.split(pending + piece)
+            # The last part may still grow with the next piece
+            pending = parts.pop()
+            for part in parts:
+                yield part + '\n'
+        if pending:
+            yield pending
+
+
+class FragmentCache:
+    """Per-glyph rendered fragments, dropped whenever the catalog version changes."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._fragments = {}
+        self.hits = 0
+        self.misses = 0
+
+    def for_version(self, version):
+        if version != self._version:
+            with self._lock:
+                if version != self._version:
+                    self._fragments = {}
+                    self._version = version
+        return self._fragments
+
+    def clear(self):
+        with self._lock:
+            self._fragments = {}
+
+    def stats(self):
+        return {
+            "catalog_version": self._version,
+            "fragments": len(self._fragments),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+class PromptContext:
+    """Everything a slot function may read for one render."""
+
+    def __init__(self, glyph_details, catalog_version=None, fragments=None):
+        self.glyph_details = glyph_details
+        self.glyph_sequence = ''.join([g['unicode_char'] for g in glyph_details])
+        self.names = [g.get('name', 'Sacred Symbol') for g in glyph_details]
+        self.meanings = [g['primary_meaning'] for g in glyph_details]
+        self.mystical = [g.get('mystical_significance', '') for g in glyph_details if g.get('mystical_significance')]
+        self.categories = list(set([g.get('category', '') for g in glyph_details if g.get('category')]))
+        self.interpretations = []
+        for g in glyph_details:
+            self.interpretations.extend(g.get('layered_interpretations', []))
+        self._cache = fragments.for_version(catalog_version) if fragments is not None else None
+        self._fragment_stats = fragments
+
+    def fragment(self, kind, glyph, build):
+        """Returns build(glyph), cached per (kind, glyph) for this catalog version."""
+        if self._cache is None:
+            return build(glyph)
+        key = (kind, glyph['unicode_char'])
+        text = self._cache.get(key)
+        if text is None:
+            text = self._cache[key] = build(glyph)
+            self._fragment_stats.misses += 1
+        else:
+            self._fragment_stats.hits += 1
+        return text
+
+
+class PromptRegistry:
+    """Named PromptTemplates plus the fragment cache they share."""
+
+    def __init__(self):
+        self.templates = {}
+        self.fragments = FragmentCache()
+
+    def register(self, name, source, slots):
+        self.templates[name] = PromptTemplate(name, source, slots)
+
+    def __contains__(self, name):
+        return name in self.templates
+
+    def context(self, glyph_details, catalog_version=None):
+        return PromptContext(glyph_details, catalog_version, self.fragments)
+
+    def render(self, name, context):
+        return self.templates[name].render(context)
+
+    def sections(self, name, context):
+        return self.templates[name].iter_sections(context)
+
+    def stats(self):
+        return {"templates": sorted(self.templates), **self.fragments.stats()}
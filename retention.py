@@ -0,0 +1,380 @@
+"""Retention for the interaction log: archive old rows, then compact.
+
+Rows older than ``retention_days`` move, a chunk at a time, into an
+archive database as zlib-compressed NDJSON blobs grouped by month.
+SQLite does not commit a WAL database and an ATTACHed one atomically, so
+each chunk is committed to the archive first and only then deleted from
+`interactions`. A chunk's ids go into `archived_ids` in the same archive
+transaction, so a run that stops between the two leaves rows that are
+both archived and live, and says which. The next run deletes those before
+archiving anything, and leaves any still selected out of its chunks, so an
+id is archived once however a later cutoff splits the chunks. Archived
+months stay readable through ``periods()`` and ``iter_archive()``.
+
+Compaction never takes the database away from the writer for long:
+free pages are released with incremental_vacuum in small steps, ANALYZE
+runs with an analysis_limit, and the WAL checkpoint is PASSIVE.
+
+Every worker runs a scheduler thread, but a lease row in
+`maintenance_leases` lets only one of them do a run per interval.
+"""
+import heapq
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import zlib
+from datetime import datetime, timedelta
+
+from ingest import Interaction
+
+ARCHIVE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS archive.interaction_chunks (
+  id INTEGER PRIMARY KEY,
+  period TEXT NOT NULL,
+  first_id INTEGER NOT NULL,
+  last_id INTEGER NOT NULL,
+  row_count INTEGER NOT NULL,
+  min_timestamp TEXT NOT NULL,
+  max_timestamp TEXT NOT NULL,
+  archived_at TEXT NOT NULL,
+  payload BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS archive.idx_interaction_chunks_period ON interaction_chunks (period, first_id);
+
+CREATE TABLE IF NOT EXISTS archive.archived_ids (
+  id INTEGER PRIMARY KEY
+);
+"""
+
+LEASE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS maintenance_leases (
+  name TEXT PRIMARY KEY,
+  owner TEXT NOT NULL,
+  expires_at REAL NOT NULL
+) WITHOUT ROWID;
+"""
+
+ACQUIRE_LEASE = (
+    'INSERT INTO maintenance_leases (name, owner, expires_at) VALUES (?, ?, ?) '
+    'ON CONFLICT (name) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at '
+    'WHERE maintenance_leases.expires_at < ?'
+)
+
+ARCHIVED_COLUMNS = ('id', 'timestamp', 'action_type', 'user_input', 'system_response',
+                    'related_glyphs', 'context_summary')
+
+# PRAGMA auto_vacuum value for INCREMENTAL
+AUTO_VACUUM_INCREMENTAL = 2
+
+
+def archived_interaction(row):
+    """An Interaction rebuilt from an archived row, for recounting derived tables."""
+    try:
+        related_glyphs = json.loads(row['related_glyphs']) if row['related_glyphs'] else None
+    except ValueError:
+        related_glyphs = None
+    return Interaction(datetime.fromisoformat(row['timestamp']), row['action_type'], row['user_input'],
+                       row['system_response'], related_glyphs, row['context_summary'])
+
+
+def period_of(timestamp):
+    """Archive period for a stored timestamp: its calendar month."""
+    return timestamp[:7]
+
+
+class RetentionManager:
+    """Archives and compacts the interaction log on a schedule."""
+
+    def __init__(self, connect, archive_path, retention_days=90, interval=3600.0, chunk_size=1000,
+                 vacuum_pages=256, initial_delay=60.0):
+        self.connect = connect
+        self.archive_path = archive_path
+        self.retention_days = retention_days
+        self.interval = interval
+        self.chunk_size = chunk_size
+        self.vacuum_pages = vacuum_pages
+        self.initial_delay = initial_delay
+        self.hooks = []
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self._stop = threading.Event()
+        self.runs = 0
+        self.archived = 0
+        self.vacuumed_pages = 0
+        self.failed_runs = 0
+        self.last_run = None
+        self.last_error = None
+
+    @property
+    def enabled(self):
+        return self.retention_days > 0
+
+    def add_hook(self, hook):
+        """Registers hook(db, ids), run in the transaction that deletes those interactions."""
+        self.hooks.append(hook)
+
+    def _attach(self, db):
+        db.execute('ATTACH DATABASE ? AS archive', (self.archive_path,))
+        tables = {row[0] for row in db.execute(
+            "SELECT name FROM archive.sqlite_master WHERE type = 'table' "
+            "AND name IN ('interaction_chunks', 'archived_ids')")}
+        db.executescript(ARCHIVE_SCHEMA)
+        if 'interaction_chunks' in tables and 'archived_ids' not in tables:
+            # Archive written before ids were tracked: index the chunks it holds
+            with db:
+                for (payload,) in db.execute('SELECT payload FROM archive.interaction_chunks').fetchall():
+                    lines = zlib.decompress(payload).decode('utf-8').split('\n')
+                    db.executemany('INSERT OR IGNORE INTO archive.archived_ids (id) VALUES (?)',
+                                   [(json.loads(line)['id'],) for line in lines])
+
+    # --- Scheduling ---
+
+    def ensure_started(self):
+        """Starts this worker's scheduler thread if it is not already running."""
+        if not self.enabled:
+            return
+        pid = os.getpid()
+        if self._thread is not None and self._pid == pid:
+            return
+        with self._lock:
+            if self._thread is None or self._pid != pid:
+                self._pid = pid
+                self._stop = threading.Event()
+                self._thread = threading.Thread(target=self._run, args=(self._stop,),
+                                                name='interaction-retention', daemon=True)
+                self._thread.start()
+
+    def _run(self, stop):
+        if stop.wait(self.initial_delay):
+            return
+        while True:
+            try:
+                self.run_if_due()
+            except Exception as e:
+                self.failed_runs += 1
+                self.last_error = str(e)
+                print(f"Retention run failed: {e}")
+            if stop.wait(self.interval):
+                return
+
+    def run_if_due(self):
+        """Runs retention if no worker has done so within the last interval."""
+        db = self.connect()
+        try:
+            db.executescript(LEASE_SCHEMA)
+            owner = f"{socket.gethostname()}:{os.getpid()}"
+            now = time.time()
+            with db:
+                acquired = db.execute(ACQUIRE_LEASE, ('retention', owner, now + self.interval, now)).rowcount == 1
+            if not acquired:
+                return None
+            return self.run(db)
+        finally:
+            db.close()
+
+    # --- Archival ---
+
+    def run(self, db, now=None, full_vacuum=False):
+        """Archives expired rows and compacts; returns a summary of the run."""
+        started = time.perf_counter()
+        cutoff = ((now or datetime.now()) - timedelta(days=self.retention_days)).isoformat(' ')
+        self._attach(db)
+        try:
+            archived, chunks = self.archive_before(db, cutoff)
+        finally:
+            db.execute('DETACH DATABASE archive')
+        vacuumed = self.compact(db, full=full_vacuum)
+
+        self.runs += 1
+        self.archived += archived
+        self.vacuumed_pages += vacuumed
+        self.last_error = None
+        self.last_run = {
+            "at": datetime.now().isoformat(' '),
+            "cutoff": cutoff,
+            "archived": archived,
+            "chunks": chunks,
+            "vacuumed_pages": vacuumed,
+            "ms": round((time.perf_counter() - started) * 1000, 3),
+        }
+        print(f"🗄️ Retention: archived {archived} interactions before {cutoff} in {chunks} chunks, "
+              f"released {vacuumed} pages")
+        return self.last_run
+
+    def archive_before(self, db, cutoff):
+        """Moves interactions older than ``cutoff`` into the attached archive."""
+        self._delete(db, [row[0] for row in db.execute(
+            'SELECT i.id FROM interactions AS i JOIN archive.archived_ids AS a ON a.id = i.id '
+            'WHERE i.timestamp < ?', (cutoff,))])
+        columns = ', '.join(f'i.{column}' for column in ARCHIVED_COLUMNS)
+        select = (f"SELECT {columns}, a.id IS NOT NULL FROM interactions AS i "
+                  'LEFT JOIN archive.archived_ids AS a ON a.id = i.id '
+                  'WHERE i.timestamp < ? ORDER BY i.timestamp, i.id LIMIT ?')
+        archived = chunks = 0
+        while True:
+            rows = db.execute(select, (cutoff, self.chunk_size)).fetchall()
+            if not rows:
+                break
+            by_period = {}
+            for *row, already_archived in rows:
+                if not already_archived:
+                    by_period.setdefault(period_of(row[1]), []).append(row)
+            # Short write transactions so the interaction writer keeps flowing:
+            # first make the chunk durable in the archive...
+            with db:
+                for period, period_rows in by_period.items():
+                    self._write_chunk(db, period, period_rows)
+                    chunks += 1
+            # ...then delete it from the live table
+            self._delete(db, [row[0] for row in rows])
+            archived += sum(len(period_rows) for period_rows in by_period.values())
+            if len(rows) < self.chunk_size:
+                break
+        return archived, chunks
+
+    def _delete(self, db, ids):
+        """Deletes archived interactions from the live table, running the hooks."""
+        if not ids:
+            return
+        with db:
+            for hook in self.hooks:
+                hook(db, ids)
+            db.executemany('DELETE FROM interactions WHERE id = ?', [(row_id,) for row_id in ids])
+
+    def _write_chunk(self, db, period, rows):
+        """Stores one chunk and records its ids as archived; the caller commits."""
+        ids = [row[0] for row in rows]
+        timestamps = [row[1] for row in rows]
+        lines = [json.dumps(dict(zip(ARCHIVED_COLUMNS, row)), ensure_ascii=False) for row in rows]
+        payload = zlib.compress('\n'.join(lines).encode('utf-8'), 9)
+        db.execute(
+            'INSERT INTO archive.interaction_chunks '
+            '(period, first_id, last_id, row_count, min_timestamp, max_timestamp, archived_at, payload) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+            (period, min(ids), max(ids), len(rows), min(timestamps), max(timestamps),
+             datetime.now().isoformat(' '), payload)
+        )
+        db.executemany('INSERT INTO archive.archived_ids (id) VALUES (?)', [(row_id,) for row_id in ids])
+
+    # --- Compaction ---
+
+    def compact(self, db, full=False):
+        """Releases free pages and refreshes planner statistics; returns pages released."""
+        released = 0
+        if full:
+            # One-off: switch to incremental auto_vacuum, which only a full VACUUM can apply
+            db.execute(f'PRAGMA auto_vacuum = {AUTO_VACUUM_INCREMENTAL}')
+            db.execute('VACUUM')
+        elif db.execute('PRAGMA auto_vacuum').fetchone()[0] == AUTO_VACUUM_INCREMENTAL:
+            free = db.execute('PRAGMA freelist_count').fetchone()[0]
+            while free:
+                # executescript steps the pragma to completion; execute() frees one page
+                db.executescript(f'PRAGMA incremental_vacuum({self.vacuum_pages})')
+                remaining = db.execute('PRAGMA freelist_count').fetchone()[0]
+                if remaining >= free:
+                    break
+                released += free - remaining
+                free = remaining
+        else:
+            print("    [Retention] auto_vacuum is not INCREMENTAL; "
+                  "run `flask --app codex_app retention-run --full-vacuum` once to enable it")
+
+        db.execute('PRAGMA analysis_limit = 1000')
+        db.execute('ANALYZE')
+        db.commit()
+        db.execute('PRAGMA wal_checkpoint(PASSIVE)').fetchall()
+        return released
+
+    # --- Reading the archive ---
+
+    def _archive(self):
+        if not os.path.exists(self.archive_path):
+            return None
+        return sqlite3.connect(f"file:{self.archive_path}?mode=ro", uri=True)
+
+    def periods(self):
+        """Returns one summary dict per archived month, newest first."""
+        archive = self._archive()
+        if archive is None:
+            return []
+        try:
+            rows = archive.execute(
+                'SELECT period, SUM(row_count), COUNT(*), MIN(min_timestamp), MAX(max_timestamp), '
+                'SUM(LENGTH(payload)) FROM interaction_chunks GROUP BY period ORDER BY period DESC'
+            ).fetchall()
+        except sqlite3.OperationalError:
+            return []
+        finally:
+            archive.close()
+        return [{"period": period, "interactions": count, "chunks": chunks, "first": first, "last": last,
+                 "compressed_bytes": size} for period, count, chunks, first, last, size in rows]
+
+    def iter_archive(self, period, after_id=None):
+        """Yields archived interactions for a month in id order.
+
+        Chunks of one month can interleave ids when late rows arrive, so
+        they are merged by id. A chunk is only decompressed once the merge
+        reaches its first_id, so a short page reads a few chunks, not the
+        rest of the month.
+        """
+        archive = self._archive()
+        if archive is None:
+            return
+        after_id = after_id if after_id is not None else -1
+        try:
+            chunks = archive.execute(
+                'SELECT first_id, payload FROM interaction_chunks WHERE period = ? AND last_id > ? ORDER BY first_id',
+                (period, after_id)
+            )
+            # (next id, chunk number, position, rows) per open chunk
+            heap = []
+            pending = chunks.fetchone()
+            opened = 0
+            while heap or pending is not None:
+                while pending is not None and (not heap or pending[0] <= heap[0][0]):
+                    lines = zlib.decompress(pending[1]).decode('utf-8').split('\n')
+                    rows = sorted((row for row in map(json.loads, lines) if row['id'] > after_id),
+                                  key=lambda row: row['id'])
+                    if rows:
+                        heapq.heappush(heap, (rows[0]['id'], opened, 0, rows))
+                        opened += 1
+                    pending = chunks.fetchone()
+                _, number, position, rows = heapq.heappop(heap)
+                yield rows[position]
+                if position + 1 < len(rows):
+                    heapq.heappush(heap, (rows[position + 1]['id'], number, position + 1, rows))
+        finally:
+            archive.close()
+
+    def archived_batches(self):
+        """Yields every archived interaction as Interaction lists, one per chunk, in no particular order."""
+        archive = self._archive()
+        if archive is None:
+            return
+        try:
+            for (payload,) in archive.execute('SELECT payload FROM interaction_chunks'):
+                lines = zlib.decompress(payload).decode('utf-8').split('\n')
+                yield [archived_interaction(json.loads(line)) for line in lines]
+        except sqlite3.OperationalError:
+            # No chunks table yet
+            return
+        finally:
+            archive.close()
+
+    def stats(self):
+        return {
+            "enabled": self.enabled,
+            "retention_days": self.retention_days,
+            "interval": self.interval,
+            "archive_path": self.archive_path,
+            "runs": self.runs,
+            "failed_runs": self.failed_runs,
+            "archived": self.archived,
+            "vacuumed_pages": self.vacuumed_pages,
+            "last_run": self.last_run,
+            "last_error": self.last_error,
+        }
@@ -0,0 +1,93 @@
+"""Counter tables maintained alongside the interaction log.
+
+``interaction_counts`` holds one row per (action_type, user_input) and
+``interaction_totals`` one row per action_type. Both are updated by an
+InteractionWriter hook in the same transaction as the INSERT, so reading
+the top N is an index scan instead of a GROUP BY over every interaction.
+"""
+from collections import Counter
+
+from derived_tables import create_missing
+
+ROLLUP_TABLES = ('interaction_counts', 'interaction_totals')
+
+ROLLUP_SCHEMA = """
+CREATE TABLE IF NOT EXISTS interaction_counts (
+  action_type TEXT NOT NULL,
+  user_input TEXT NOT NULL,
+  count INTEGER NOT NULL,
+  PRIMARY KEY (action_type, user_input)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_interaction_counts_top ON interaction_counts (action_type, count DESC);
+
+CREATE TABLE IF NOT EXISTS interaction_totals (
+  action_type TEXT PRIMARY KEY,
+  count INTEGER NOT NULL
+) WITHOUT ROWID;
+"""
+
+UPSERT_COUNT = (
+    'INSERT INTO interaction_counts (action_type, user_input, count) VALUES (?, ?, ?) '
+    'ON CONFLICT (action_type, user_input) DO UPDATE SET count = count + excluded.count'
+)
+UPSERT_TOTAL = (
+    'INSERT INTO interaction_totals (action_type, count) VALUES (?, ?) '
+    'ON CONFLICT (action_type) DO UPDATE SET count = count + excluded.count'
+)
+
+
+class InteractionRollups:
+    """Keeps the counter tables in step with `interactions`."""
+
+    def __init__(self):
+        self._ready = False
+
+    def ensure_schema(self, db):
+        """Creates missing rollup tables, backfilling them from existing history."""
+        if not self._ready:
+            create_missing(db, ROLLUP_TABLES, ROLLUP_SCHEMA, self.rebuild, 'Rollups')
+            self._ready = True
+
+    def record(self, db, interactions):
+        """InteractionWriter hook: adds a batch to the counters.
+
+        Registered with ensure_schema as its prepare step; a backfill here
+        would already include the batch just inserted.
+        """
+        counts = Counter()
+        totals = Counter()
+        for interaction in interactions:
+            if interaction.action_type is None:
+                continue
+            totals[interaction.action_type] += 1
+            if interaction.user_input is not None:
+                counts[(interaction.action_type, interaction.user_input)] += 1
+        db.executemany(UPSERT_COUNT, [(action, text, n) for (action, text), n in counts.items()])
+        db.executemany(UPSERT_TOTAL, list(totals.items()))
+
+    def rebuild(self, db):
+        """Recomputes both tables from `interactions`; the caller commits."""
+        db.execute('DELETE FROM interaction_counts')
+        db.execute('DELETE FROM interaction_totals')
+        db.execute(
+            'INSERT INTO interaction_counts (action_type, user_input, count) '
+            'SELECT action_type, user_input, COUNT(*) FROM interactions '
+            'WHERE user_input IS NOT NULL GROUP BY action_type, user_input'
+        )
+        db.execute(
+            'INSERT INTO interaction_totals (action_type, count) '
+            'SELECT action_type, COUNT(*) FROM interactions GROUP BY action_type'
+        )
+
+    def top(self, db, action_type, limit=5, skip_empty=False):
+        """Returns the most frequent user_input values for an action type."""
+        self.ensure_schema(db)
+        query = 'SELECT user_input, count FROM interaction_counts WHERE action_type = ?'
+        if skip_empty:
+            query += " AND user_input != ''"
+        return db.execute(query + ' ORDER BY count DESC LIMIT ?', (action_type, limit)).fetchall()
+
+    def total(self, db):
+        self.ensure_schema(db)
+        return db.execute('SELECT COALESCE(SUM(count), 0) FROM interaction_totals').fetchone()[0]
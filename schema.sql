@@ -8,4 +8,22 @@ CREATE TABLE interactions (
   system_response TEXT,
   related_glyphs TEXT,
   context_summary TEXT
-); 
\ No newline at end of file
+); 
+
+-- Counters maintained by rollups.py; rebuild with `flask --app codex_app rebuild-rollups`.
+-- Derived tables are defined in their modules (rollups.ROLLUP_SCHEMA and so on);
+-- init_db recreates them from there after this script, along with the
+-- /api/history indexes in history.HISTORY_INDEXES.
+DROP TABLE IF EXISTS interaction_counts;
+DROP TABLE IF EXISTS interaction_totals;
+
+-- Checkpointed trend sketches (sketches.py)
+DROP TABLE IF EXISTS sketch_state;
+
+-- Per-minute/hour/day counts (activity.py); bucket is the epoch second it starts at
+DROP TABLE IF EXISTS activity_buckets;
+
+-- related_glyphs normalized, with per-glyph and co-occurrence counts (cooccurrence.py)
+DROP TABLE IF EXISTS interaction_glyphs;
+DROP TABLE IF EXISTS glyph_stats;
+DROP TABLE IF EXISTS glyph_pairs;
@@ -0,0 +1,331 @@
+"""Ranked full-text search over the glyph catalog and the Unikemet sign list.
+
+Every curated glyph and every Unikemet code point becomes one document.
+Field-weighted term scores (BM25-style idf and tf saturation) are folded
+into the postings at build time, so a query only sums precomputed weights.
+
+All text is folded before indexing, so Egyptological transliteration
+(ḥmsꞽ, wꜥb) is searchable as plain ASCII (hmsi, wab). Transliteration
+fields additionally feed a trigram index for typo-tolerant matches.
+"""
+import heapq
+import math
+import re
+import threading
+import time
+import unicodedata
+from array import array
+from bisect import bisect_left
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+# Conventional ASCII renderings of the Egyptological transliteration letters
+EGYPTOLOGICAL_FOLDS = str.maketrans({
+    'ꜣ': 'a',   # aleph
+    'ꜥ': 'a',   # ayin
+    'ꞽ': 'i',   # yod
+    'ỉ': 'i',
+    'ḥ': 'h',
+    'ḫ': 'kh',
+    'ẖ': 'kh',
+    'š': 'sh',
+    'ḳ': 'q',
+    'ḏ': 'dj',
+    'ṯ': 'tj',
+})
+
+# Bare-letter variant (nṯr -> ntr), also indexed for fuzzy matching
+SIMPLE_FOLDS = str.maketrans({'ḫ': 'h', 'ẖ': 'h', 'š': 's', 'ḏ': 'd', 'ṯ': 't'})
+
+# Separators inside a transliterated word: n.y-sw.t, sḏm=f, (j)
+TRANSLITERATION_JOINERS = re.compile(r"[.\-=()⸗]")
+
+STOPWORDS = frozenset([
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'in', 'is',
+    'it', 'its', 'of', 'on', 'or', 'the', 'to', 'with'
+])
+
+# Catalog fields plus the Unikemet tags that describe the same things
+FIELD_WEIGHTS = {
+    'name': 3.0,
+    'transliteration': 2.5,
+    'primary_meaning': 2.0,
+    'layered_interpretations': 1.2,
+    'category': 1.0,
+    'mystical_significance': 0.6,
+    'phonetic_value': 2.0,
+    'kEH_FVal': 2.5,
+    'kEH_Desc': 1.0,
+    'kEH_Func': 0.8,
+}
+SIGN_FIELDS = ('kEH_FVal', 'kEH_Desc', 'kEH_Func')
+TRANSLITERATION_FIELDS = ('transliteration', 'phonetic_value', 'kEH_FVal')
+
+# A query term also matches longer tokens it prefixes, at a discount
+PREFIX_WEIGHT = 0.5
+MAX_PREFIX_EXPANSIONS = 64
+TF_SATURATION = 1.2
+
+# Trigram matches count only above this Dice similarity, scaled by the weight
+FUZZY_MIN_SIMILARITY = 0.4
+FUZZY_WEIGHT = 8.0
+FUZZY_MIN_LENGTH = 3
+
+# A document with popularity 1.0 scores this much more than an unknown one
+POPULARITY_WEIGHT = 0.5
+
+
+def fold(text, simple=False):
+    """Lowercases and reduces text to unaccented, ASCII-like letters."""
+    text = text.casefold()
+    if text.isascii():
+        return text
+    text = unicodedata.normalize('NFC', text)
+    if simple:
+        text = text.translate(SIMPLE_FOLDS)
+    text = text.translate(EGYPTOLOGICAL_FOLDS)
+    text = unicodedata.normalize('NFKD', text)
+    return ''.join(ch for ch in text if not unicodedata.combining(ch))
+
+
+def tokenize(text):
+    return [token for token in TOKEN_PATTERN.findall(fold(text)) if token not in STOPWORDS]
+
+
+def transliteration_words(text, simple=False):
+    return TOKEN_PATTERN.findall(TRANSLITERATION_JOINERS.sub('', fold(text, simple)))
+
+
+def trigrams(word):
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TrigramIndex:
+    """Maps transliteration words to documents and trigrams to words."""
+
+    def __init__(self):
+        self.words = []
+        self.word_docs = []
+        self.word_trigram_counts = array('H')
+        self.postings = {}
+        self._word_ids = {}
+
+    def add(self, word, doc):
+        word_id = self._word_ids.get(word)
+        if word_id is None:
+            word_id = self._word_ids[word] = len(self.words)
+            self.words.append(word)
+            self.word_docs.append(array('I'))
+            grams = trigrams(word)
+            self.word_trigram_counts.append(len(grams))
+            for gram in grams:
+                self.postings.setdefault(gram, array('I')).append(word_id)
+        docs = self.word_docs[word_id]
+        if not docs or docs[-1] != doc:
+            docs.append(doc)
+
+    def similar_words(self, word, min_similarity=FUZZY_MIN_SIMILARITY):
+        """Yields (word_id, Dice similarity) for words sharing enough trigrams."""
+        grams = trigrams(word)
+        shared = {}
+        for gram in grams:
+            for word_id in self.postings.get(gram, ()):
+                shared[word_id] = shared.get(word_id, 0) + 1
+        for word_id, count in shared.items():
+            similarity = 2.0 * count / (len(grams) + self.word_trigram_counts[word_id])
+            if similarity >= min_similarity:
+                yield word_id, similarity
+
+    def match(self, query):
+        """Returns {doc: best similarity} over the words of ``query``."""
+        best = {}
+        for word in set(transliteration_words(query)):
+            if len(word) < FUZZY_MIN_LENGTH:
+                continue
+            for word_id, similarity in self.similar_words(word):
+                for doc in self.word_docs[word_id]:
+                    if similarity > best.get(doc, 0.0):
+                        best[doc] = similarity
+        return best
+
+
+def _field_texts(value):
+    if isinstance(value, (list, tuple)):
+        return [str(item) for item in value if item]
+    return [str(value)] if value else []
+
+
+class SearchIndex:
+    """Immutable inverted index; rebuilt whenever the catalog changes."""
+
+    def __init__(self, glyphs, signs=None, catalog_version=None):
+        started = time.perf_counter()
+        self.catalog_version = catalog_version
+        self.signs = signs
+        self.keys = []
+        self.glyphs = []
+        self.sign_rows = array('i')
+
+        curated_chars = set()
+        documents = []
+        for glyph in glyphs:
+            char = glyph.get('unicode_char')
+            if not char or char in curated_chars:
+                continue
+            curated_chars.add(char)
+            fields = {field: glyph.get(field) for field in FIELD_WEIGHTS if glyph.get(field)}
+            row = signs.find_row(ord(char)) if signs is not None and len(char) == 1 else None
+            if row is not None:
+                for tag in SIGN_FIELDS:
+                    fields.setdefault(tag, signs.raw_value(row, tag))
+            documents.append((char, glyph, -1 if row is None else row, fields))
+        self.curated_count = len(documents)
+
+        if signs is not None:
+            for row in range(len(signs)):
+                char = chr(signs.code_points[row])
+                if char in curated_chars:
+                    continue
+                fields = {tag: signs.raw_value(row, tag) for tag in SIGN_FIELDS}
+                documents.append((char, None, row, fields))
+
+        term_frequencies = {}
+        self.trigrams = TrigramIndex()
+        for doc, (char, glyph, row, fields) in enumerate(documents):
+            self.keys.append(char)
+            self.glyphs.append(glyph)
+            self.sign_rows.append(row)
+            for field in TRANSLITERATION_FIELDS:
+                for text in _field_texts(fields.get(field)):
+                    for word in set(transliteration_words(text) + transliteration_words(text, simple=True)):
+                        self.trigrams.add(word, doc)
+            for field, value in fields.items():
+                for text in _field_texts(value):
+                    for token in tokenize(text):
+                        per_doc = term_frequencies.setdefault(token, {})
+                        per_field = per_doc.setdefault(doc, {})
+                        per_field[field] = per_field.get(field, 0) + 1
+
+        doc_count = len(documents)
+        self.postings = {}
+        for token, per_doc in term_frequencies.items():
+            idf = math.log(1 + (doc_count - len(per_doc) + 0.5) / (len(per_doc) + 0.5))
+            docs = array('I')
+            weights = array('f')
+            for doc, per_field in per_doc.items():
+                weight = 0.0
+                for field, tf in per_field.items():
+                    weight += FIELD_WEIGHTS[field] * tf * (TF_SATURATION + 1) / (tf + TF_SATURATION)
+                docs.append(doc)
+                weights.append(weight * idf)
+            self.postings[token] = (docs, weights)
+        self.vocabulary = sorted(self.postings)
+        self.build_seconds = time.perf_counter() - started
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _expand(self, term):
+        """Yields (token, weight multiplier) for a query term."""
+        if term in self.postings:
+            yield term, 1.0
+        start = bisect_left(self.vocabulary, term)
+        for token in self.vocabulary[start:start + MAX_PREFIX_EXPANSIONS + 1]:
+            if not token.startswith(term):
+                break
+            if token != term:
+                yield token, PREFIX_WEIGHT
+
+    def search(self, query, limit=20, offset=0, catalog_only=False, fuzzy=True, popularity=None,
+               popularity_weight=POPULARITY_WEIGHT):
+        """Returns (total matches, [(doc, score), ...]) for one page.
+
+        Every query term must match a document, exactly or as a prefix.
+        With ``fuzzy``, documents whose transliteration is close to a query
+        word are added, or boosted if they already matched. ``popularity``
+        is an optional per-document array of scores in [0, 1] that scales
+        relevance, so engagement reorders matches without adding any.
+        """
+        scores = self._term_scores(query, catalog_only)
+        if fuzzy:
+            for doc, similarity in self.trigrams.match(query).items():
+                if catalog_only and doc >= self.curated_count:
+                    continue
+                scores[doc] = scores.get(doc, 0.0) + similarity * FUZZY_WEIGHT
+        if not scores:
+            return 0, []
+        if popularity is not None:
+            scores = {doc: score * (1.0 + popularity_weight * popularity[doc]) for doc, score in scores.items()}
+
+        ranked = heapq.nlargest(offset + limit, scores.items(), key=lambda item: (item[1], -item[0]))
+        return len(scores), ranked[offset:]
+
+    def _term_scores(self, query, catalog_only):
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return {}
+
+        scores = None
+        for term in terms:
+            term_scores = {}
+            for token, multiplier in self._expand(term):
+                docs, weights = self.postings[token]
+                for doc, weight in zip(docs, weights):
+                    if catalog_only and doc >= self.curated_count:
+                        continue
+                    score = weight * multiplier
+                    # A document counts the best expansion of each term once
+                    if score > term_scores.get(doc, 0.0):
+                        term_scores[doc] = score
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {doc: score + term_scores[doc] for doc, score in scores.items() if doc in term_scores}
+            if not scores:
+                return {}
+        return scores
+
+    def result(self, doc, score):
+        item = {"unicode_char": self.keys[doc], "score": round(score, 4)}
+        if self.glyphs[doc] is not None:
+            item["source"] = "catalog"
+            item["glyph"] = self.glyphs[doc]
+        else:
+            item["source"] = "unikemet"
+            item["sign"] = self.signs.record(self.sign_rows[doc])
+        return item
+
+
+class SearchIndexHolder:
+    """Keeps one SearchIndex per worker, rebuilt when its inputs change."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._index = None
+        self.build_count = 0
+
+    def get(self, snapshot, signs):
+        index = self._index
+        if index is not None and index.catalog_version == snapshot.version and index.signs is signs:
+            return index
+        with self._lock:
+            index = self._index
+            if index is None or index.catalog_version != snapshot.version or index.signs is not signs:
+                index = SearchIndex(snapshot.glyphs, signs, snapshot.version)
+                self._index = index
+                self.build_count += 1
+                print(f"🔍 Search index built: {len(index)} documents, "
+                      f"{len(index.postings)} terms in {index.build_seconds * 1000:.0f}ms")
+            return index
+
+    def stats(self):
+        index = self._index
+        return {
+            "built": index is not None,
+            "build_count": self.build_count,
+            "documents": len(index) if index else 0,
+            "terms": len(index.postings) if index else 0,
+            "transliteration_words": len(index.trigrams.words) if index else 0,
+            "build_ms": round(index.build_seconds * 1000, 3) if index else None,
+        }
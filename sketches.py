@@ -0,0 +1,361 @@
+"""Fixed-memory streaming summaries of the interaction stream.
+
+``TrendSketches`` is fed every accepted event by the ingest routes and
+answers near-real-time questions without touching `interactions`:
+
+* top searches and top ideals - Space-Saving, with a count-min sketch for
+  point estimates of terms that are not in the top list
+* distinct seekers and distinct queries - HyperLogLog
+
+Each worker accumulates a delta; a checkpoint merges it into the shared
+state in `sketch_state` inside one transaction, so every worker's events
+land exactly once. Reads merge the stored state with the local delta.
+All of these summaries are mergeable, so memory stays fixed no matter how
+many events or workers there are.
+"""
+import atexit
+import hashlib
+import json
+import math
+import os
+import threading
+import time
+import zlib
+from array import array
+from datetime import datetime
+
+from derived_tables import create_missing
+
+SKETCH_TABLES = ('sketch_state',)
+
+SKETCH_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sketch_state (
+  name TEXT PRIMARY KEY,
+  data BLOB NOT NULL,
+  updated_at TEXT NOT NULL
+) WITHOUT ROWID;
+"""
+
+MASK64 = (1 << 64) - 1
+
+
+def hash64(key):
+    return int.from_bytes(hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+class CountMinSketch:
+    """Point estimates that never undercount; overcount by at most 2N/width w.h.p."""
+
+    def __init__(self, width=2048, depth=4, counts=None):
+        self.width = width
+        self.depth = depth
+        self.counts = counts if counts is not None else array('Q', bytes(8 * width * depth))
+
+    def _cells(self, key):
+        # Kirsch-Mitzenmacher: depth indexes from two halves of one hash
+        h = int.from_bytes(hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest(), 'little')
+        h1, h2 = h & MASK64, (h >> 64) | 1
+        return [row * self.width + (h1 + row * h2) % self.width for row in range(self.depth)]
+
+    def add(self, key, count=1):
+        for cell in self._cells(key):
+            self.counts[cell] += count
+
+    def estimate(self, key):
+        return min(self.counts[cell] for cell in self._cells(key))
+
+    def merge(self, other):
+        for cell, count in enumerate(other.counts):
+            if count:
+                self.counts[cell] += count
+
+    def dumps(self):
+        header = json.dumps([self.width, self.depth]).encode('ascii')
+        return header + b'\n' + zlib.compress(self.counts.tobytes())
+
+    @classmethod
+    def loads(cls, data):
+        header, body = data.split(b'\n', 1)
+        width, depth = json.loads(header)
+        counts = array('Q')
+        counts.frombytes(zlib.decompress(body))
+        return cls(width, depth, counts)
+
+
+class SpaceSaving:
+    """Top-k heavy hitters in ``capacity`` counters (Metwally et al.).
+
+    Each tracked key has a count and the maximum overestimate in it, so
+    ``count - error`` is a guaranteed lower bound.
+    """
+
+    def __init__(self, capacity=100):
+        self.capacity = capacity
+        self.counters = {}
+
+    def _min_count(self):
+        if len(self.counters) < self.capacity:
+            return 0
+        return min(count for count, _ in self.counters.values())
+
+    def add(self, key, count=1):
+        entry = self.counters.get(key)
+        if entry is not None:
+            entry[0] += count
+            return
+        if len(self.counters) < self.capacity:
+            self.counters[key] = [count, 0]
+            return
+        victim = min(self.counters, key=lambda k: self.counters[k][0])
+        floor = self.counters.pop(victim)[0]
+        self.counters[key] = [floor + count, floor]
+
+    def merge(self, other):
+        """Combines two summaries; keys missing from a full side take its minimum as error."""
+        floor, other_floor = self._min_count(), other._min_count()
+        merged = {}
+        for key in self.counters.keys() | other.counters.keys():
+            count, error = self.counters.get(key, (floor, floor))
+            other_count, other_error = other.counters.get(key, (other_floor, other_floor))
+            merged[key] = [count + other_count, error + other_error]
+        top = sorted(merged.items(), key=lambda item: item[1][0], reverse=True)[:self.capacity]
+        self.counters = dict(top)
+
+    def top(self, limit):
+        ranked = sorted(self.counters.items(), key=lambda item: (-item[1][0], item[0]))[:limit]
+        return [{"term": key, "count": count, "error": error} for key, (count, error) in ranked]
+
+    def dumps(self):
+        return zlib.compress(json.dumps([self.capacity, self.counters], ensure_ascii=False).encode('utf-8'))
+
+    @classmethod
+    def loads(cls, data):
+        capacity, counters = json.loads(zlib.decompress(data))
+        sketch = cls(capacity)
+        sketch.counters = counters
+        return sketch
+
+
+class HyperLogLog:
+    """Distinct count in 2**precision bytes, about 1.04/sqrt(2**precision) error."""
+
+    def __init__(self, precision=12, registers=None):
+        self.precision = precision
+        self.size = 1 << precision
+        self.registers = registers if registers is not None else bytearray(self.size)
+
+    def add(self, key):
+        h = hash64(key)
+        index = h >> (64 - self.precision)
+        rest = (h << self.precision) & MASK64
+        rank = 64 - self.precision + 1 if rest == 0 else 64 - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def count(self):
+        alpha = 0.7213 / (1 + 1.079 / self.size)
+        estimate = alpha * self.size * self.size / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * self.size and zeros:
+            # Small-range correction: linear counting
+            estimate = self.size * math.log(self.size / zeros)
+        return round(estimate)
+
+    def merge(self, other):
+        self.registers = bytearray(max(a, b) for a, b in zip(self.registers, other.registers))
+
+    def dumps(self):
+        return bytes([self.precision]) + bytes(self.registers)
+
+    @classmethod
+    def loads(cls, data):
+        return cls(data[0], bytearray(data[1:]))
+
+
+class TopTerms:
+    """Space-Saving top list backed by a count-min sketch for other terms."""
+
+    def __init__(self, capacity=100, width=2048, depth=4, heavy=None, sketch=None):
+        self.heavy = heavy or SpaceSaving(capacity)
+        self.sketch = sketch or CountMinSketch(width, depth)
+
+    def add(self, term, count=1):
+        self.heavy.add(term, count)
+        self.sketch.add(term, count)
+
+    def merge(self, other):
+        self.heavy.merge(other.heavy)
+        self.sketch.merge(other.sketch)
+
+    def estimate(self, term):
+        entry = self.heavy.counters.get(term)
+        estimate = self.sketch.estimate(term)
+        return min(entry[0], estimate) if entry is not None else estimate
+
+    def dumps(self):
+        heavy, sketch = self.heavy.dumps(), self.sketch.dumps()
+        return len(heavy).to_bytes(4, 'little') + heavy + sketch
+
+    @classmethod
+    def loads(cls, data):
+        split = 4 + int.from_bytes(data[:4], 'little')
+        return cls(heavy=SpaceSaving.loads(data[4:split]), sketch=CountMinSketch.loads(data[split:]))
+
+
+def normalize_term(text):
+    return ' '.join(str(text).split()).casefold() if text else ''
+
+
+class TrendSketches:
+    """Per-worker deltas of the trend sketches, checkpointed into SQLite."""
+
+    # Sketch name -> (factory, loader)
+    SKETCHES = {
+        'top_searches': (TopTerms, TopTerms.loads),
+        'top_ideals': (TopTerms, TopTerms.loads),
+        'distinct_seekers': (HyperLogLog, HyperLogLog.loads),
+        'distinct_queries': (HyperLogLog, HyperLogLog.loads),
+    }
+
+    def __init__(self, connect, checkpoint_interval=30.0):
+        self.connect = connect
+        self.checkpoint_interval = checkpoint_interval
+        self._lock = threading.Lock()
+        self._delta = self._empty()
+        self._delta_events = 0
+        self._thread = None
+        self._pid = None
+        self._ready = False
+        self.checkpoints = 0
+        self.last_checkpoint = None
+        self.last_checkpoint_seconds = None
+        self.last_error = None
+        atexit.register(self.checkpoint)
+
+    def ensure_schema(self, db):
+        """Creates `sketch_state` if missing; it starts empty."""
+        if not self._ready:
+            create_missing(db, SKETCH_TABLES, SKETCH_SCHEMA, None, 'Sketches')
+            self._ready = True
+
+    def _empty(self):
+        return {name: factory() for name, (factory, _) in self.SKETCHES.items()}
+
+    def observe(self, interactions, seeker=None):
+        """Adds accepted interactions; ``seeker`` is an opaque per-client hash."""
+        self._ensure_started()
+        with self._lock:
+            delta = self._delta
+            if seeker:
+                delta['distinct_seekers'].add(seeker)
+            for interaction in interactions:
+                term = normalize_term(interaction.user_input)
+                if not term:
+                    continue
+                if interaction.action_type == 'glyph_search':
+                    delta['top_searches'].add(term)
+                    delta['distinct_queries'].add(term)
+                elif interaction.action_type == 'ideal_click':
+                    delta['top_ideals'].add(term)
+            self._delta_events += len(interactions)
+
+    def _ensure_started(self):
+        pid = os.getpid()
+        if self._thread is not None and self._pid == pid:
+            return
+        with self._lock:
+            if self._thread is None or self._pid != pid:
+                if self._pid is not None:
+                    # Forked: the parent's delta is the parent's to checkpoint
+                    self._delta = self._empty()
+                    self._delta_events = 0
+                self._pid = pid
+                self._thread = threading.Thread(target=self._run, name='trend-checkpoint', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.checkpoint_interval)
+            try:
+                self.checkpoint()
+            except Exception as e:
+                self.last_error = str(e)
+                print(f"Trend checkpoint failed: {e}")
+
+    def _load(self, db):
+        stored = self._empty()
+        for name, data in db.execute('SELECT name, data FROM sketch_state'):
+            if name in self.SKETCHES:
+                stored[name] = self.SKETCHES[name][1](data)
+        return stored
+
+    def checkpoint(self):
+        """Merges this worker's delta into `sketch_state`."""
+        if self._pid != os.getpid():
+            return
+        with self._lock:
+            delta, events = self._delta, self._delta_events
+            self._delta, self._delta_events = self._empty(), 0
+        if not events:
+            return
+        started = time.perf_counter()
+        db = self.connect()
+        try:
+            self.ensure_schema(db)
+            # BEGIN IMMEDIATE so two workers cannot read-merge-write over each other
+            db.execute('BEGIN IMMEDIATE')
+            try:
+                stored = self._load(db)
+                now = datetime.now().isoformat(' ')
+                for name, sketch in stored.items():
+                    sketch.merge(delta[name])
+                    db.execute('INSERT OR REPLACE INTO sketch_state (name, data, updated_at) VALUES (?, ?, ?)',
+                               (name, sketch.dumps(), now))
+                db.commit()
+            except Exception:
+                db.rollback()
+                with self._lock:
+                    # Keep the events for the next attempt
+                    for name, sketch in self._delta.items():
+                        delta[name].merge(sketch)
+                    self._delta, self._delta_events = delta, self._delta_events + events
+                raise
+        finally:
+            db.close()
+        self.checkpoints += 1
+        self.last_checkpoint = now
+        self.last_checkpoint_seconds = time.perf_counter() - started
+
+    def snapshot(self, db):
+        """Stored state merged with this worker's not yet checkpointed delta."""
+        self.ensure_schema(db)
+        stored = self._load(db)
+        with self._lock:
+            for name, sketch in self._delta.items():
+                stored[name].merge(sketch)
+        return stored
+
+    def trends(self, db, limit=10, terms=()):
+        sketches = self.snapshot(db)
+        result = {
+            "top_searches": sketches['top_searches'].heavy.top(limit),
+            "top_ideals": sketches['top_ideals'].heavy.top(limit),
+            "distinct_seekers": sketches['distinct_seekers'].count(),
+            "distinct_queries": sketches['distinct_queries'].count(),
+            "checkpointed_at": self.last_checkpoint,
+        }
+        if terms:
+            result["search_estimates"] = {term: sketches['top_searches'].estimate(normalize_term(term))
+                                          for term in terms}
+        return result
+
+    def stats(self):
+        return {
+            "checkpoint_interval": self.checkpoint_interval,
+            "pending_events": self._delta_events,
+            "checkpoints": self.checkpoints,
+            "last_checkpoint": self.last_checkpoint,
+            "last_checkpoint_ms": round(self.last_checkpoint_seconds * 1000, 3)
+            if self.last_checkpoint_seconds is not None else None,
+            "last_error": self.last_error,
+        }
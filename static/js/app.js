@@ -10,6 +10,11 @@ class MysticalGlyphCodex {
         this.selectedGlyphs = [];
         this.currentSearchTerm = '';
         this.currentCategory = '';
+        this.searchSequence = 0;
+        this.interactionBuffer = [];
+        this.interactionFlushTimer = null;
+        this.interactionFlushDelay = 5000;
+        this.interactionFlushSize = 20;
         this.isLoading = false;
         this.tooltip = null;
         this.generatedPrompt = null;
@@ -472,33 +477,23 @@ class MysticalGlyphCodex {
         });
     }
 
-    handleSearch() {
+    async handleSearch() {
         const searchTerm = this.searchBox?.value.toLowerCase() || '';
         const selectedCategory = this.categoryFilter?.value || '';
 
         this.currentSearchTerm = searchTerm;
         this.currentCategory = selectedCategory;
+        const searchId = ++this.searchSequence;
 
         let filtered = [...this.glyphData];
 
         // Divine search through sacred knowledge
         if (searchTerm) {
-            filtered = filtered.filter(glyph => {
-                const searchableFields = [
-                    glyph.name,
-                    glyph.primary_meaning,
-                    glyph.meaning,
-                    glyph.transliteration,
-                    glyph.category,
-                    glyph.mystical_significance,
-                    ...(glyph.layered_interpretations || [])
-                ].filter(Boolean);
-
-                return searchableFields.some(field => 
-                    field.toLowerCase().includes(searchTerm)
-                );
-            });
-            
+            filtered = await this.searchGlyphs(searchTerm);
+
+            // A newer keystroke has already taken over
+            if (searchId !== this.searchSequence) return;
+
             // Track sacred search
             this.trackInteraction('glyph_search', searchTerm, `Sought wisdom: ${searchTerm}`, 
                 filtered.map(g => g.unicode_char || g.symbol));
@@ -518,6 +513,38 @@ class MysticalGlyphCodex {
         }
     }
 
+    async searchGlyphs(searchTerm) {
+        // Ranked results from the server-side index, in relevance order
+        try {
+            const params = new URLSearchParams({ q: searchTerm, scope: 'catalog', limit: 200 });
+            const response = await fetch(`/api/search?${params}`);
+            if (!response.ok) throw new Error('Search transmission failed');
+            const data = await response.json();
+            return data.results.map(result => result.glyph);
+        } catch (error) {
+            console.error('Falling back to local search:', error);
+            return this.localSearch(searchTerm);
+        }
+    }
+
+    localSearch(searchTerm) {
+        return this.glyphData.filter(glyph => {
+            const searchableFields = [
+                glyph.name,
+                glyph.primary_meaning,
+                glyph.meaning,
+                glyph.transliteration,
+                glyph.category,
+                glyph.mystical_significance,
+                ...(glyph.layered_interpretations || [])
+            ].filter(Boolean);
+
+            return searchableFields.some(field =>
+                field.toLowerCase().includes(searchTerm)
+            );
+        });
+    }
+
     copyGlyph(symbol, name) {
         if (!navigator.clipboard) {
             this.fallbackCopyTextToClipboard(symbol);
@@ -788,23 +815,52 @@ class MysticalGlyphCodex {
         document.body.removeChild(textArea);
     }
 
-    async trackInteraction(actionType, userInput, systemResponse, relatedGlyphs) {
+    trackInteraction(actionType, userInput, systemResponse, relatedGlyphs) {
+        this.interactionBuffer.push({
+            action_type: actionType,
+            user_input: userInput,
+            system_response: systemResponse,
+            related_glyphs: relatedGlyphs || [],
+            context_summary: `Seeker performed ${actionType} in the mystical realm`,
+            recordedAt: Date.now()
+        });
+
+        if (this.interactionBuffer.length >= this.interactionFlushSize) {
+            this.flushInteractions();
+        } else if (!this.interactionFlushTimer) {
+            this.interactionFlushTimer = setTimeout(() => this.flushInteractions(), this.interactionFlushDelay);
+        }
+    }
+
+    async flushInteractions(useBeacon = false) {
+        clearTimeout(this.interactionFlushTimer);
+        this.interactionFlushTimer = null;
+        if (this.interactionBuffer.length === 0) return;
+
+        const now = Date.now();
+        const events = this.interactionBuffer.splice(0).map(({ recordedAt, ...event }) => ({
+            ...event,
+            age_ms: now - recordedAt
+        }));
+        const body = JSON.stringify(events);
+
+        // sendBeacon survives the page being hidden or unloaded
+        if (useBeacon && navigator.sendBeacon &&
+            navigator.sendBeacon('/api/log_interactions', new Blob([body], { type: 'application/json' }))) {
+            return;
+        }
+
         try {
-            await fetch('/api/log_interaction', {
+            await fetch('/api/log_interactions', {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json',
                 },
-                body: JSON.stringify({
-                    action_type: actionType,
-                    user_input: userInput,
-                    system_response: systemResponse,
-                    related_glyphs: relatedGlyphs || [],
-                    context_summary: `Seeker performed ${actionType} in the mystical realm`
-                })
+                body,
+                keepalive: true
             });
         } catch (error) {
-            console.error('Error recording sacred interaction:', error);
+            console.error('Error recording sacred interactions:', error);
         }
     }
 
@@ -1174,7 +1230,7 @@ class MysticalGlyphCodex {
         if (generateBtn) generateBtn.disabled = true;
 
         try {
-            const response = await fetch('/api/generate_glyph_prompt', {
+            const request = {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json',
@@ -1183,13 +1239,18 @@ class MysticalGlyphCodex {
                     glyphs: this.selectedGlyphs,
                     type: promptType
                 })
-            });
+            };
 
-            if (!response.ok) throw new Error('Failed to generate prompt');
-
-            const result = await response.json();
+            let result;
+            if (window.ReadableStream && window.TextDecoder) {
+                result = await this.streamGeneratedPrompt(request);
+            } else {
+                const response = await fetch('/api/generate_glyph_prompt', request);
+                if (!response.ok) throw new Error('Failed to generate prompt');
+                result = await response.json();
+                this.displayGeneratedPrompt(result);
+            }
             this.generatedPrompt = result;
-            this.displayGeneratedPrompt(result);
 
             this.showDivineMessage('✨ Sacred prompt generated!');
             this.trackInteraction('prompt_generated', result.glyph_sequence, `Generated ${promptType} prompt`, this.selectedGlyphs);
@@ -1202,6 +1263,54 @@ class MysticalGlyphCodex {
         }
     }
 
+    // Reads the prompt as Server-Sent Events and shows each section as it arrives
+    async streamGeneratedPrompt(request) {
+        const response = await fetch('/api/generate_glyph_prompt/stream', request);
+        if (!response.ok || !response.body) throw new Error('Failed to generate prompt');
+
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        const promptText = document.getElementById('generated-prompt-text');
+        let result = null;
+        let buffer = '';
+        let done = false;
+
+        while (!done) {
+            const chunk = await reader.read();
+            if (chunk.done) break;
+            buffer += decoder.decode(chunk.value, { stream: true });
+
+            let boundary;
+            while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+                const block = buffer.slice(0, boundary);
+                buffer = buffer.slice(boundary + 2);
+
+                let event = 'message';
+                let data = '';
+                block.split('\n').forEach(line => {
+                    if (line.startsWith('event: ')) event = line.slice(7);
+                    else if (line.startsWith('data: ')) data += line.slice(6);
+                });
+                const payload = data ? JSON.parse(data) : {};
+
+                if (event === 'meta') {
+                    result = { ...payload, prompt: '' };
+                    this.displayGeneratedPrompt(result);
+                } else if (event === 'section' && result) {
+                    result.prompt += payload.text;
+                    if (promptText) promptText.textContent = result.prompt;
+                } else if (event === 'error') {
+                    throw new Error(payload.error || 'Failed to generate prompt');
+                } else if (event === 'done') {
+                    done = true;
+                }
+            }
+        }
+
+        if (!result || !done) throw new Error('Prompt stream ended early');
+        return result;
+    }
+
     displayGeneratedPrompt(result) {
         const container = document.getElementById('generated-prompt-container');
         const glyphSequence = document.getElementById('generated-glyph-sequence');
@@ -1339,12 +1448,20 @@ document.addEventListener('DOMContentLoaded', () => {
 
 // Handle cosmic visibility changes
 document.addEventListener('visibilitychange', () => {
+    if (document.visibilityState === 'hidden' && app) {
+        app.flushInteractions(true);
+    }
     if (document.visibilityState === 'visible' && app) {
         console.log('🌟 The seeker returns to the sacred realm...');
         app.showDivineMessage('🌟 Welcome back, seeker of wisdom');
     }
 });
 
+// Some browsers skip visibilitychange on unload; pagehide still fires
+window.addEventListener('pagehide', () => {
+    if (app) app.flushInteractions(true);
+});
+
 // Sacred error handling
 window.addEventListener('error', (e) => {
     console.error('🔥 Cosmic disturbance detected:', e.error);
@@ -0,0 +1,20 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from history import parse_time
+
+
+def test_parse_time_keeps_naive_times():
+    assert parse_time('2024-03-01T12:30:00') == '2024-03-01 12:30:00'
+
+
+def test_parse_time_converts_offsets_to_local_time():
+    expected = datetime(2024, 3, 1, 12, 30, tzinfo=timezone.utc).astimezone().replace(tzinfo=None)
+    assert parse_time('2024-03-01T12:30:00+00:00') == expected.isoformat(' ')
+    assert parse_time('2024-03-01T14:30:00+02:00') == expected.isoformat(' ')
+
+
+def test_parse_time_rejects_garbage():
+    with pytest.raises(ValueError):
+        parse_time('yesterday')
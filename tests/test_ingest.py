@@ -0,0 +1,58 @@
+import sqlite3
+from datetime import datetime
+
+import pytest
+
+from ingest import Interaction, InteractionWriter, interaction_from_json, interactions_from_batch
+
+
+def open_db():
+    db = sqlite3.connect(':memory:')
+    db.execute(
+        'CREATE TABLE interactions (id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp DATETIME NOT NULL, '
+        'action_type TEXT NOT NULL, user_input TEXT, system_response TEXT, related_glyphs TEXT, '
+        'context_summary TEXT)'
+    )
+    return db
+
+
+@pytest.mark.parametrize('data', [
+    ['not', 'an', 'object'],
+    {'user_input': 'ankh'},
+    {'action_type': ''},
+    {'action_type': 7},
+    {'action_type': 'search', 'user_input': {'q': 'ankh'}},
+    {'action_type': 'search', 'context_summary': ['a']},
+])
+def test_interaction_from_json_rejects_unstorable_bodies(data):
+    with pytest.raises(ValueError):
+        interaction_from_json(data)
+
+
+def test_failed_batch_falls_back_to_single_rows():
+    db = open_db()
+    writer = InteractionWriter(lambda: db)
+    seen = []
+    writer.add_hook(lambda db, interactions: seen.extend(interactions))
+    now = datetime(2024, 1, 1)
+    batch = [Interaction(now, 'search', f'query {n}', None, None, None) for n in range(5)]
+    batch.insert(2, Interaction(now, None, 'bad', None, None, None))
+
+    writer._flush(db, batch)
+
+    assert db.execute('SELECT COUNT(*) FROM interactions').fetchone()[0] == 5
+    assert (writer.written, writer.failed) == (5, 1)
+    assert [i.user_input for i in seen] == [f'query {n}' for n in range(5)]
+
+
+def test_batch_rejects_each_unstorable_event():
+    events = [
+        {'action_type': 'search', 'user_input': 'ankh'},
+        {'action_type': 'search', 'user_input': {'q': 'ankh'}},
+        'not an event',
+        {'action_type': 'view', 'system_response': ['x'], 'age_ms': 10},
+        {'action_type': 'view', 'context_summary': 'ok', 'age_ms': 'soon'},
+    ]
+    interactions, rejected = interactions_from_batch(events, datetime(2024, 1, 1))
+    assert [i.action_type for i in interactions] == ['search', 'view']
+    assert rejected == [1, 2, 3]
@@ -0,0 +1,31 @@
+import sqlite3
+
+from prompt_cache import PromptCache
+
+
+def disk_rows(path):
+    return sqlite3.connect(path).execute('SELECT version, key, body FROM prompt_cache ORDER BY version').fetchall()
+
+
+def promote(cache, version, key, body):
+    cache.put(version, key, body)
+    cache.get(version, key)
+
+
+def test_disk_tier_misses_after_a_code_change(tmp_path):
+    path = str(tmp_path / 'prompts.db')
+    promote(PromptCache(disk_path=path, code_version='a'), 'v1', 'k', b'old')
+
+    assert PromptCache(disk_path=path, code_version='b').get('v1', 'k') is None
+    assert disk_rows(path) == []
+
+
+def test_older_worker_keeps_newer_disk_rows(tmp_path):
+    path = str(tmp_path / 'prompts.db')
+    promote(PromptCache(disk_path=path, code_version='a'), 'v1', 'k', b'old')
+    promote(PromptCache(disk_path=path, code_version='b'), 'v1', 'k', b'new')
+    # A worker not yet restarted onto the new code
+    promote(PromptCache(disk_path=path, code_version='a'), 'v1', 'k', b'old')
+
+    assert disk_rows(path) == [('v1:a', 'k', b'old'), ('v1:b', 'k', b'new')]
+    assert PromptCache(disk_path=path, code_version='b').get('v1', 'k') == b'new'
@@ -0,0 +1,81 @@
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+
+from retention import RetentionManager
+
+START = datetime(2024, 1, 1)
+
+
+class Crash(Exception):
+    pass
+
+
+def open_db(path):
+    db = sqlite3.connect(path)
+    db.execute('PRAGMA journal_mode = WAL')
+    db.execute(
+        'CREATE TABLE interactions (id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp DATETIME NOT NULL, '
+        'action_type TEXT NOT NULL, user_input TEXT, system_response TEXT, related_glyphs TEXT, '
+        'context_summary TEXT)'
+    )
+    db.executemany(
+        'INSERT INTO interactions (timestamp, action_type, user_input) VALUES (?, ?, ?)',
+        [((START + timedelta(minutes=n)).isoformat(' '), 'search', f'query {n}') for n in range(400)]
+    )
+    db.commit()
+    return db
+
+
+def archived_ids(retention):
+    return [row['id'] for period in retention.periods() for row in retention.iter_archive(period['period'])]
+
+
+def test_rerun_after_crash_archives_each_row_once(tmp_path):
+    db = open_db(str(tmp_path / 'live.db'))
+    retention = RetentionManager(None, str(tmp_path / 'archive.db'), retention_days=1, chunk_size=1000)
+
+    def crash(db, ids):
+        raise Crash()
+
+    # Crash after the chunk of 300 expired rows is committed to the archive
+    retention.add_hook(crash)
+    with pytest.raises(Crash):
+        retention.run(db, now=START + timedelta(days=1, minutes=300))
+    assert db.execute('SELECT COUNT(*) FROM interactions').fetchone()[0] == 400
+    assert len(archived_ids(retention)) == 300
+
+    # A later cutoff: 360 expired, 300 of them already archived
+    retention.hooks.remove(crash)
+    deleted = []
+    retention.add_hook(lambda db, ids: deleted.extend(ids))
+    summary = retention.run(db, now=START + timedelta(days=1, minutes=360))
+
+    ids = archived_ids(retention)
+    assert ids == list(range(1, 361))
+    assert sum(len(batch) for batch in retention.archived_batches()) == 360
+    assert summary['archived'] == 60
+    assert sorted(deleted) == list(range(1, 361))
+    assert db.execute('SELECT MIN(id), COUNT(*) FROM interactions').fetchone() == (361, 40)
+
+
+def test_rerun_skips_archived_rows_within_a_chunk(tmp_path):
+    db = open_db(str(tmp_path / 'live.db'))
+    retention = RetentionManager(None, str(tmp_path / 'archive.db'), retention_days=1, chunk_size=100)
+    calls = []
+
+    def crash_once(db, ids):
+        calls.append(ids)
+        if len(calls) == 2:
+            raise Crash()
+
+    # First chunk moved, second archived but still live
+    retention.add_hook(crash_once)
+    with pytest.raises(Crash):
+        retention.run(db, now=START + timedelta(days=1, minutes=250))
+
+    summary = retention.run(db, now=START + timedelta(days=1, minutes=330))
+    assert archived_ids(retention) == list(range(1, 331))
+    assert summary['archived'] == 130
+    assert db.execute('SELECT COUNT(*) FROM interactions').fetchone()[0] == 70
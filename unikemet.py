@@ -0,0 +1,407 @@
+"""Reader for Unikemet.txt, the Unicode Egyptian Hieroglyphs data file.
+
+Each non-comment line is ``U+XXXXX<TAB>kEH_Tag<TAB>value`` and lines are
+grouped by code point in ascending order. The parser streams the file and
+only keeps the record for the current code point in flight.
+
+Run ``python unikemet.py`` to benchmark parse time and memory footprint.
+"""
+import heapq
+import re
+import sys
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import islice
+
+UNIKEMET_TAGS = (
+    'kEH_Cat', 'kEH_Core', 'kEH_Desc', 'kEH_Func', 'kEH_FVal', 'kEH_UniK',
+    'kEH_JSesh', 'kEH_HG', 'kEH_IFAO', 'kEH_NoMirror', 'kEH_NoRotate',
+)
+
+# kEH_Core is omitted in the file for non-core signs
+DEFAULT_CORE = 'N'
+
+# Selectable fields for sign-list responses; code_point is always included
+SIGN_FIELDS = ('char',) + UNIKEMET_TAGS
+
+# Sign-code schemes and the tags that carry them
+CODE_SCHEMES = {
+    'cat': 'kEH_Cat',       # Unicode catalog, A-01-027
+    'unik': 'kEH_UniK',     # original Unikemet/Gardiner-style, A002
+    'jsesh': 'kEH_JSesh',   # JSesh, A2
+    'hg': 'kEH_HG',         # Hieroglyphica, A2
+    'ifao': 'kEH_IFAO',     # IFAO font catalog, 2,4
+}
+
+_DIGIT_RUN = re.compile(r"\d+")
+
+
+def normalize_code(code):
+    return ' '.join(code.split()).upper()
+
+
+def natural_code_key(code):
+    """Sort key that orders A2 before A10 and treats A002 and A2 as equal."""
+    return _DIGIT_RUN.sub(lambda m: str(int(m.group())).zfill(6), normalize_code(code))
+
+
+def format_code_point(cp):
+    return f"U+{cp:04X}"
+
+
+def parse_code_point(text):
+    text = text.strip().upper()
+    if text.startswith('U+'):
+        text = text[2:]
+    return int(text, 16)
+
+
+def iter_unikemet_records(lines):
+    """Yields (code_point, {tag: value}) for each code point in file order."""
+    current_cp = None
+    fields = None
+    for line_number, line in enumerate(lines, 1):
+        line = line.rstrip('\r\n')
+        if not line or line.startswith('#'):
+            continue
+        parts = line.split('\t', 2)
+        if len(parts) != 3 or not parts[0].startswith('U+'):
+            raise ValueError(f"Unikemet line {line_number}: malformed entry {line!r}")
+        cp = int(parts[0][2:], 16)
+        if cp != current_cp:
+            if fields is not None:
+                if cp < current_cp:
+                    raise ValueError(f"Unikemet line {line_number}: {parts[0]} is out of order")
+                yield current_cp, fields
+            current_cp = cp
+            fields = {}
+        fields[parts[1]] = parts[2]
+    if fields is not None:
+        yield current_cp, fields
+
+
+class SignStore:
+    """Read interface shared by the parsed and the compiled sign stores.
+
+    Subclasses provide ``code_points`` (a sorted sequence of ints) and
+    ``raw_value(row, tag)``.
+    """
+
+    def __len__(self):
+        return len(self.code_points)
+
+    def find_row(self, cp):
+        """Returns the row index for a code point, or None."""
+        row = bisect_left(self.code_points, cp)
+        if row < len(self.code_points) and self.code_points[row] == cp:
+            return row
+        return None
+
+    def lower_bound(self, cp):
+        """Returns the first row whose code point is >= cp."""
+        return bisect_left(self.code_points, cp)
+
+    def value(self, row, tag):
+        value = self.raw_value(row, tag)
+        if value is None and tag == 'kEH_Core':
+            return DEFAULT_CORE
+        return value
+
+    def record(self, row):
+        cp = self.code_points[row]
+        record = {"code_point": format_code_point(cp), "char": chr(cp)}
+        for tag in UNIKEMET_TAGS:
+            value = self.raw_value(row, tag)
+            if value is not None:
+                record[tag] = value
+        record.setdefault('kEH_Core', DEFAULT_CORE)
+        return record
+
+    def get(self, cp):
+        row = self.find_row(cp)
+        return self.record(row) if row is not None else None
+
+    def core_rows(self):
+        """Returns {core value: sorted rows}, built on first use."""
+        if self._core_rows is None:
+            rows = {}
+            for row in range(len(self)):
+                rows.setdefault(self.value(row, 'kEH_Core'), array('I')).append(row)
+            self._core_rows = rows
+        return self._core_rows
+
+    def catalog_order(self):
+        """Returns (sorted kEH_Cat values, their rows), built on first use."""
+        if self._catalog_order is None:
+            ordered = sorted((self.value(row, 'kEH_Cat') or '', row) for row in range(len(self)))
+            self._catalog_order = ([cat for cat, _ in ordered], array('I', [row for _, row in ordered]))
+        return self._catalog_order
+
+    def catalog_rows(self, catalog_from=None, catalog_to=None):
+        """Returns the rows whose kEH_Cat is in range, in row order.
+
+        Code point order is not catalog order, so the range is bisected out
+        of catalog_order() and only its rows are sorted.
+        """
+        cats, rows = self.catalog_order()
+        start = bisect_left(cats, catalog_from) if catalog_from is not None else 0
+        end = len(cats)
+        if catalog_to is not None:
+            # Upper bound is inclusive of everything it prefixes: A-05 keeps A-05-xxx
+            end = bisect_right(cats, catalog_to, lo=start, key=lambda cat: cat[:len(catalog_to)])
+        return sorted(rows[start:end])
+
+
+class UnikemetStore(SignStore):
+    """Column-oriented, code-point-sorted store of Unikemet records.
+
+    Code points live in a packed array and each tag is a column list holding
+    interned strings (or None), so repeated values such as kEH_Core or common
+    kEH_Func classifiers are stored once.
+    """
+
+    def __init__(self):
+        self.code_points = array('I')
+        self.columns = {tag: [] for tag in UNIKEMET_TAGS}
+        self.unknown_tags = set()
+        self._core_rows = None
+        self._catalog_order = None
+
+    @classmethod
+    def from_lines(cls, lines):
+        store = cls()
+        for cp, fields in iter_unikemet_records(lines):
+            store.append(cp, fields)
+        return store
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls.from_lines(f)
+
+    def append(self, cp, fields):
+        if self.code_points and cp <= self.code_points[-1]:
+            raise ValueError(f"{format_code_point(cp)} appended out of order")
+        self.code_points.append(cp)
+        for tag, column in self.columns.items():
+            value = fields.get(tag)
+            column.append(sys.intern(value) if value is not None else None)
+        self.unknown_tags.update(tag for tag in fields if tag not in self.columns)
+
+    def raw_value(self, row, tag):
+        return self.columns[tag][row]
+
+    def approx_bytes(self):
+        seen = set()
+        total = sys.getsizeof(self.code_points)
+        for column in self.columns.values():
+            total += sys.getsizeof(column)
+            for value in column:
+                if value is not None and id(value) not in seen:
+                    seen.add(id(value))
+                    total += sys.getsizeof(value)
+        return total
+
+
+def _candidate_rows(store, start_row, cores, catalog_from=None, catalog_to=None):
+    if catalog_from is not None or catalog_to is not None:
+        rows = store.catalog_rows(catalog_from, catalog_to)
+        tail = islice(rows, bisect_left(rows, start_row), None)
+        if not cores:
+            return tail
+        return (row for row in tail if store.value(row, 'kEH_Core') in cores)
+    if not cores:
+        return iter(range(start_row, len(store)))
+    core_rows = store.core_rows()
+    tails = []
+    for core in cores:
+        rows = core_rows.get(core)
+        if rows:
+            tails.append(islice(rows, bisect_left(rows, start_row), None))
+    return heapq.merge(*tails)
+
+
+def page_signs(store, after=None, limit=100, cores=None, catalog_from=None, catalog_to=None, fields=None):
+    """Returns (signs, next_cursor) for one keyset page of the sign list.
+
+    ``after`` is the last code point of the previous page. The start row is
+    found by bisection, kEH_Core filters walk precomputed row lists and a
+    kEH_Cat range is bisected out of the catalog order, so the cost depends
+    on the page size and the range, not on the size of the table or how
+    deep the cursor is.
+    """
+    start_row = store.lower_bound(after + 1) if after is not None else 0
+    signs = []
+    last_cp = None
+    for row in _candidate_rows(store, start_row, cores, catalog_from, catalog_to):
+        if len(signs) == limit:
+            # Bare hex keeps the cursor URL-safe ('+' would decode to a space)
+            return signs, f"{last_cp:X}"
+        record = store.record(row)
+        if fields:
+            record = {key: value for key, value in record.items() if key == 'code_point' or key in fields}
+        signs.append(record)
+        last_cp = store.code_points[row]
+    return signs, None
+
+
+class SignCodeIndex:
+    """Sorted per-scheme code tables with exact, prefix and range lookup.
+
+    Each scheme keeps two sorted views: natural keys for exact and range
+    queries (A2 < A10, A002 == A2) and plain uppercase codes for prefixes.
+    """
+
+    def __init__(self, signs):
+        started = time.perf_counter()
+        self.signs = signs
+        self.schemes = {}
+        for scheme, tag in CODE_SCHEMES.items():
+            codes = []
+            for row in range(len(signs)):
+                code = signs.raw_value(row, tag)
+                if code:
+                    codes.append((code, row))
+            natural = sorted((natural_code_key(code), row, code) for code, row in codes)
+            plain = sorted((normalize_code(code), row, code) for code, row in codes)
+            self.schemes[scheme] = {
+                'natural_keys': [key for key, _, _ in natural],
+                'natural_rows': array('I', [row for _, row, _ in natural]),
+                'plain_keys': [key for key, _, _ in plain],
+                'plain_rows': array('I', [row for _, row, _ in plain]),
+                'codes': {row: code for code, row in codes},
+            }
+        self.build_seconds = time.perf_counter() - started
+
+    def _selected(self, scheme):
+        if scheme is None:
+            return self.schemes.items()
+        if scheme not in self.schemes:
+            raise ValueError(f"Unknown code scheme {scheme!r}; expected one of {', '.join(self.schemes)}")
+        return [(scheme, self.schemes[scheme])]
+
+    def _matches(self, scheme, table, rows, start, end, limit):
+        for i in range(start, min(end, start + limit)):
+            row = rows[i]
+            yield scheme, table['codes'][row], row
+
+    def exact(self, code, scheme=None, limit=100):
+        key = natural_code_key(code)
+        matches = []
+        for name, table in self._selected(scheme):
+            keys = table['natural_keys']
+            start, end = bisect_left(keys, key), bisect_right(keys, key)
+            matches.extend(self._matches(name, table, table['natural_rows'], start, end, limit - len(matches)))
+        return matches
+
+    def prefix(self, prefix, scheme=None, limit=100):
+        prefix = normalize_code(prefix)
+        matches = []
+        for name, table in self._selected(scheme):
+            keys = table['plain_keys']
+            start = bisect_left(keys, prefix)
+            end = bisect_left(keys, prefix + '\U0010ffff')
+            matches.extend(self._matches(name, table, table['plain_rows'], start, end, limit - len(matches)))
+        return matches
+
+    def range(self, start_code, end_code, scheme=None, limit=100):
+        """Codes between the bounds; the upper bound includes what it prefixes."""
+        matches = []
+        for name, table in self._selected(scheme):
+            keys = table['natural_keys']
+            start = bisect_left(keys, natural_code_key(start_code)) if start_code else 0
+            end = bisect_left(keys, natural_code_key(end_code) + '\U0010ffff') if end_code else len(keys)
+            matches.extend(self._matches(name, table, table['natural_rows'], start, end, limit - len(matches)))
+        return matches
+
+
+class UnikemetLoader:
+    """Loads the Unikemet store lazily, once per worker.
+
+    A fresh compiled artifact is mapped instead of parsing the text file.
+    """
+
+    def __init__(self, path, artifact_path=None):
+        self.path = path
+        self.artifact_path = artifact_path
+        self._lock = threading.Lock()
+        self._store = None
+        self._code_index = None
+        self.backend = None
+        self.load_seconds = None
+        self.approx_bytes = None
+
+    def get(self):
+        store = self._store
+        if store is not None:
+            return store
+        with self._lock:
+            if self._store is None:
+                # Imported here: compiled_catalog builds on this module
+                from compiled_catalog import open_if_fresh
+
+                started = time.perf_counter()
+                compiled = open_if_fresh(self.artifact_path, self.path, 'unikemet')
+                if compiled is not None:
+                    store, self.backend = compiled.signs, 'compiled'
+                else:
+                    store, self.backend = UnikemetStore.from_file(self.path), 'text'
+                self.load_seconds = time.perf_counter() - started
+                self.approx_bytes = store.approx_bytes()
+                self._store = store
+                print(f"📜 Unikemet loaded from {self.backend}: {len(store)} signs in {self.load_seconds * 1000:.1f}ms")
+            return self._store
+
+    def code_index(self):
+        """Returns the SignCodeIndex for the loaded store, built on first use."""
+        store = self.get()
+        index = self._code_index
+        if index is None or index.signs is not store:
+            with self._lock:
+                if self._code_index is None or self._code_index.signs is not store:
+                    self._code_index = SignCodeIndex(store)
+                    print(f"🔍 Sign code index built in {self._code_index.build_seconds * 1000:.0f}ms")
+                index = self._code_index
+        return index
+
+    def stats(self):
+        store = self._store
+        return {
+            "path": self.path,
+            "loaded": store is not None,
+            "backend": self.backend,
+            "sign_count": len(store) if store is not None else 0,
+            "load_ms": round(self.load_seconds * 1000, 3) if self.load_seconds is not None else None,
+            "approx_bytes": self.approx_bytes,
+            "code_index_ms": round(self._code_index.build_seconds * 1000, 3) if self._code_index else None,
+        }
+
+
+def benchmark(path, runs=5):
+    import tracemalloc
+
+    # Measure memory first, before earlier runs have interned the strings
+    tracemalloc.start()
+    store = UnikemetStore.from_file(path)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        UnikemetStore.from_file(path)
+        timings.append(time.perf_counter() - started)
+
+    timings.sort()
+    print(f"signs:            {len(store)}")
+    print(f"parse time:       min {timings[0] * 1000:.1f}ms, median {timings[len(timings) // 2] * 1000:.1f}ms over {runs} runs")
+    print(f"retained memory:  {retained / 1024:.0f} KiB (tracemalloc), {store.approx_bytes() / 1024:.0f} KiB (getsizeof)")
+    print(f"peak memory:      {peak / 1024:.0f} KiB")
+    if store.unknown_tags:
+        print(f"unknown tags:     {', '.join(sorted(store.unknown_tags))}")
+
+
+if __name__ == '__main__':
+    benchmark(sys.argv[1] if len(sys.argv) > 1 else 'Unikemet.txt')